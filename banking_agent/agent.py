@@ -29,28 +29,52 @@ DOMAIN: Banking & Investment Research Navigation
 
 from __future__ import annotations
 import os
+import sys
 import asyncio
 from dotenv import load_dotenv
 
 # Google ADK Framework - Multi-agent orchestration and LLM integration
-from google.adk.agents import LlmAgent, SequentialAgent, LoopAgent
+from google.adk.agents import BaseAgent, LlmAgent, SequentialAgent, LoopAgent
 from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.adk.models import Gemini, LlmRequest, LlmResponse
 from google.adk.tools import ToolContext
 from google.genai import types
-from typing import Optional
+from typing import AsyncGenerator, Dict, List, Optional, Set, Tuple
 import logging
+import copy
+import hashlib
 import json
+import re
+from collections import OrderedDict
+import numpy as np
+from pydantic import TypeAdapter, ValidationError
 
 # Structured data models - Ensures type safety, validation, and consistent output format
 # BUSINESS REASON: Pydantic models provide schema validation for compliance/audit requirements
-from .models import AgentResponse, IntentGuardrailOutput, ValidationResult
+from .models import AgentResponse, IntentCategory, IntentGuardrailOutput, ValidationResult
+
+# Latency/cost infrastructure: embedding batching, semantic RAG cache,
+# explicit Gemini context caching, precompiled instruction templates
+from .batching import BatchCoalescer
+from .cache import SemanticCache
+from .cache.grounding import evidence_versions, is_grounded_hit, is_traceable, split_sentences, tokenize
+from .context_cache import ExplicitContextCache
+from .intent_classifier import load_intent_classifier
+from .llm import EARLY_VERDICT_METADATA_KEY, EarlyVerdictGemini, PooledGemini
+from .templating import compile_instruction_variants, compile_template, static_instruction
 
 # Agent instructions - Separated for maintainability and prompt engineering iteration
 # BUSINESS REASON: Prompts contain critical business rules, constraints, and compliance requirements
 from .prompt import (
     CONCIERGE_INSTRUCTIONS,          # Main agent behavior and response formatting rules
+    CONCIERGE_RETRY_FEEDBACK,         # Retry feedback, sent as a user message on validation retries
     INTENT_AGENT_PROMPT,              # Intent classification logic and safety guardrails
+    INTENT_EXACT_CACHE,               # Known classifications for the prompt's example messages
     VALIDATOR_INSTRUCTIONS,           # Validation agent instructions for response quality checks
+    VALIDATOR_RUNTIME_STATE,          # Per-turn response + RAG output for the validator
+    normalize_intent_message,          # Key normalization for INTENT_EXACT_CACHE
     prompt_with_handoff_instructions,  # Ensures unified system appearance (hides multi-agent architecture)
 )
 
@@ -59,7 +83,28 @@ from .prompt import (
 # are grounded in actual document content (Global Innovation Index database)
 
 # Environment configuration
-load_dotenv()
+# Loaded once per process: agent reloads (adk web --reload) and worker re-imports
+# skip re-reading .env, and the sentinel is inherited by child processes.
+# In production, set variables via the process manager; .env is a dev convenience.
+if not os.environ.get("_BANKING_AGENT_DOTENV_LOADED"):
+    load_dotenv()
+    os.environ["_BANKING_AGENT_DOTENV_LOADED"] = "1"
+
+# Event loop: use uvloop (libuv-based, lower scheduling overhead) when installed
+# adk web / api_server run on uvicorn, which already selects uvloop automatically once
+# it is installed; the policy below covers programmatic runners (asyncio.run after import).
+# An already-running loop is left alone.
+if sys.platform != "win32":
+    try:
+        import uvloop
+    except ImportError:
+        uvloop = None
+
+    if uvloop is not None:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
 
 # Logging configuration for validation failures and compliance monitoring
 logger = logging.getLogger(__name__)
@@ -69,6 +114,611 @@ logger = logging.getLogger(__name__)
 # Different environments (dev/staging/prod) can use different models without code changes
 MODEL_NAME = os.environ.get("GEMINI_MODEL", "gemini-2.5-flash")
 
+# Intent classification is a narrow 4-class task, so it runs on a smaller, faster model
+# BUSINESS DECISION: flash-lite cuts intent-stage latency and cost; set GEMINI_INTENT_MODEL
+# to MODEL_NAME's value if classification accuracy on the eval set drops below threshold
+INTENT_MODEL_NAME = os.environ.get("GEMINI_INTENT_MODEL", "gemini-2.5-flash-lite")
+
+# Retry policy for Gemini calls: exponential backoff with jitter on throttling / transient errors
+# BUSINESS REASON: Under provider throttling (429) an immediate retry just burns quota; spreading
+# retries lets transient errors recover. Validation failures are NOT retried here - they are
+# handled by the LoopAgent with feedback and need no delay.
+# Delays: 0.25s, 0.5s, 1s (+ up to 1s jitter each), capped at 4s
+LLM_RETRY_OPTIONS = types.HttpRetryOptions(
+    attempts=4,
+    initial_delay=0.25,
+    exp_base=2,
+    max_delay=4.0,
+    jitter=1.0,
+    http_status_codes=[429, 500, 502, 503, 504],
+)
+
+
+def _gemini(model_name: str, model_class: type = PooledGemini) -> Gemini:
+    """Gemini model for an agent, with LLM_RETRY_OPTIONS applied and the shared connection pool."""
+    return model_class(model=model_name, retry_options=LLM_RETRY_OPTIONS)
+
+# Fully assembled agent instructions, built once at import
+# The validator's runtime tail uses Jinja2 expressions (retry_count + 1,
+# avery_response.text) that ADK's placeholder substitution leaves literal, so it
+# is a precompiled template rendered per turn (see templating.py). The concierge
+# and intent prompts have no runtime state and are returned as-is, skipping
+# ADK's per-call placeholder scan; the concierge's retry feedback is sent as a
+# message instead (see add_retry_feedback).
+CONCIERGE_AGENT_INSTRUCTION = static_instruction(prompt_with_handoff_instructions(CONCIERGE_INSTRUCTIONS))
+render_retry_feedback = compile_template(CONCIERGE_RETRY_FEEDBACK)
+# The validator's static rules branch on user intent; each branch is pre-rendered
+# once here so a request only carries the rules for its own intent
+VALIDATOR_AGENT_INSTRUCTION = compile_instruction_variants(
+    VALIDATOR_INSTRUCTIONS,
+    VALIDATOR_RUNTIME_STATE,
+    "user_intent.intent",
+    [intent.value for intent in IntentCategory],
+)
+INTENT_AGENT_INSTRUCTION = static_instruction(INTENT_AGENT_PROMPT)
+
+# Template variables referenced by CONCIERGE_RETRY_FEEDBACK and VALIDATOR_RUNTIME_STATE.
+# Always written in this order with these defaults so every turn renders the
+# runtime tail the same way and the static instruction prefix stays byte-identical.
+TEMP_STATE_DEFAULTS = {
+    "temp:retry_count": 0,
+    "temp:validation_feedback": "",
+    "temp:is_valid": False,
+    "temp:last_rag_output": "",
+    "temp:rag_query": "",
+    "temp:rag_cache": {},
+}
+
+
+def _ensure_temp_state(state) -> None:
+    """Write any missing TEMP_STATE_DEFAULTS keys into session state."""
+    for key, default in TEMP_STATE_DEFAULTS.items():
+        if key not in state:
+            state[key] = copy.copy(default)
+
+
+# Explicit context cache TTL (seconds) for static instructions + tool declarations
+# BUSINESS DECISION: Cached tokens skip prefill and are billed at the cached rate;
+# set GEMINI_CONTEXT_CACHE_TTL_SECONDS=0 to rely on implicit caching only
+CONTEXT_CACHE_TTL_SECONDS = int(os.environ.get("GEMINI_CONTEXT_CACHE_TTL_SECONDS", "3600"))
+context_cache = ExplicitContextCache(ttl_seconds=CONTEXT_CACHE_TTL_SECONDS, model=_gemini(MODEL_NAME))
+
+
+# ============================================================================
+# CALLBACK: Explicit Context Cache
+# ============================================================================
+# BUSINESS PURPOSE: Cut per-turn input cost and TTFT for the large static prompts
+#
+# HOW IT WORKS:
+# - The static instruction prefix (handoff text + rules) and tool declarations
+#   are stored once in a Gemini cachedContents resource (refreshed before TTL expiry)
+# - Each request references it via cached_content instead of resending it
+# - The validator's RUNTIME STATE tail is sent as a leading user message because
+#   Gemini disallows system_instruction alongside cached_content
+# - Falls back to the unmodified request (implicit caching) if the cache can't be created
+# ============================================================================
+async def use_context_cache(
+    callback_context: CallbackContext, llm_request: LlmRequest
+) -> Optional[LlmResponse]:
+    """
+    Point the model request at an explicit context cache for its static prefix.
+
+    Args:
+        callback_context: Callback context for the agent making the call
+        llm_request: Model request about to be sent (modified in place)
+
+    Returns:
+        None to proceed with the (possibly rewritten) model call
+    """
+    if CONTEXT_CACHE_TTL_SECONDS > 0:
+        await context_cache.apply(llm_request)
+    return None
+
+
+# ============================================================================
+# CALLBACK: Retry Feedback Message
+# ============================================================================
+# BUSINESS PURPOSE: Keep the concierge's prompt prefix cacheable across retries
+#
+# On a validation retry the concierge must see the validator's feedback. It is
+# appended as the LAST user message of the request rather than rendered into
+# the system instruction: the instruction, tools and conversation so far are
+# then byte-identical to the previous attempt, so the retry's prefill is served
+# from the prompt cache and only the feedback itself is new input.
+# ============================================================================
+async def add_retry_feedback(
+    callback_context: CallbackContext, llm_request: LlmRequest
+) -> Optional[LlmResponse]:
+    """
+    Append rendered CONCIERGE_RETRY_FEEDBACK to the request on retry attempts.
+
+    Args:
+        callback_context: Callback context for the concierge
+        llm_request: Model request about to be sent (modified in place)
+
+    Returns:
+        None to proceed with the model call
+    """
+    state = callback_context.state.to_dict()
+    if state.get("temp:retry_count", 0) > 0:
+        llm_request.contents.append(types.Content(
+            role="user",
+            parts=[types.Part(text=render_retry_feedback(state))],
+        ))
+    return None
+
+
+# ============================================================================
+# CALLBACK: Prompt Cache Observability
+# ============================================================================
+# BUSINESS PURPOSE: Verify that Gemini's implicit prompt cache is being hit
+#
+# WHY THIS IS NEEDED:
+# - Instructions are structured as STATIC PREFIX + RUNTIME STATE tail so the
+#   provider can reuse the prefix across turns (lower TTFT and input cost)
+# - Implicit caching only applies once the prefix crosses the model's minimum
+#   (1024 tokens for gemini-2.5-flash) and is byte-identical between requests
+# - cached_content_token_count in usage metadata confirms the prefix was reused
+# ============================================================================
+async def log_prompt_cache_usage(
+    callback_context: CallbackContext, llm_response: LlmResponse
+) -> Optional[LlmResponse]:
+    """
+    Log prompt vs cached token counts reported by Gemini for each model call.
+
+    Args:
+        callback_context: Callback context for the agent making the call
+        llm_response: Model response carrying usage metadata
+
+    Returns:
+        None to keep the model response unchanged
+    """
+    usage = llm_response.usage_metadata
+    if usage is not None:
+        logger.debug(
+            "%s prompt_tokens=%s cached_tokens=%s",
+            callback_context.agent_name,
+            usage.prompt_token_count,
+            usage.cached_content_token_count,
+        )
+    return None
+
+# ============================================================================
+# RAG CONFIGURATION + SPECULATIVE PREFETCH
+# ============================================================================
+# BUSINESS PURPOSE: Take RAG retrieval off the critical path for investment questions
+#
+# WHY SPECULATIVE PREFETCH:
+# - SequentialAgent runs intent_agent before the concierge, so the concierge's
+#   RAG search cannot start until classification finishes
+# - The raw user message is a good first retrieval query, so retrieval is started
+#   as soon as the invocation begins, in parallel with intent classification
+# - The critical path becomes max(t_intent, t_rag) instead of t_intent + t_rag
+#
+# LIFECYCLE:
+# - root_agent before_agent_callback starts the prefetch task (not for greetings /
+#   blocklisted requests the intent fast path answers)
+# - intent_agent after_agent_callback cancels it for greetings / disallowed requests
+# - search_documents consumes it when asked for the same query (exact after
+#   normalization, or cosine similarity >= RAG_PREFETCH_MIN_SIMILARITY) instead
+#   of re-issuing the search; a rewritten query runs its own search
+# - root_agent after_agent_callback cancels anything left unconsumed
+#
+# Tasks are tracked per invocation_id in a module-level dict rather than in session
+# state: state deltas are serialized into events and must stay JSON-compatible.
+# ============================================================================
+
+# Default number of results for RAG searches (search_documents default + prefetch)
+RAG_RESULT_LIMIT = 5
+
+# Cap on concurrent speculative searches so prefetch never floods Cognee's
+# connection pool; when saturated the prefetch is skipped, not queued
+RAG_PREFETCH_CONCURRENCY = int(os.environ.get("RAG_PREFETCH_CONCURRENCY", "4"))
+_rag_prefetch_slots = asyncio.Semaphore(RAG_PREFETCH_CONCURRENCY)
+
+# Minimum cosine similarity between the agent's search query and the raw user
+# message for the prefetched results to be reused (same bar as the semantic cache)
+RAG_PREFETCH_MIN_SIMILARITY = 0.95
+
+# invocation_id -> (query, limit, task)
+_rag_prefetch: Dict[str, Tuple[str, int, asyncio.Task]] = {}
+
+# Intents that never need RAG results - speculative retrieval is discarded for these
+_NO_RAG_INTENTS = {"greet", "out_of_scope"}
+
+
+# ============================================================================
+# CROSS-SESSION SEMANTIC RAG CACHE
+# ============================================================================
+# BUSINESS PURPOSE: Serve paraphrased repeat questions without a Cognee search
+#
+# HOW IT WORKS:
+# - The query is embedded with Cognee's embedding engine
+# - Random-projection LSH (8 tables x 16 bits) finds previously answered queries
+#   with a similar embedding; cosine similarity >= 0.95 is a hit
+# - Hits return the stored formatted search_documents output
+# - Entries expire after RAG_SEMANTIC_CACHE_TTL_SECONDS, LRU-capped at 10k entries
+#
+# INVALIDATION: Cleared whenever the knowledge base is re-ingested or reset
+# (rag.retrieval.on_index_refresh)
+#
+# Empty results are not cached so newly ingested documents are picked up
+# ============================================================================
+
+RAG_SEMANTIC_CACHE_TTL_SECONDS = float(os.environ.get("RAG_SEMANTIC_CACHE_TTL_SECONDS", "3600"))
+rag_semantic_cache = SemanticCache(
+    threshold=0.95,
+    num_tables=8,
+    hash_bits=16,
+    max_entries=10_000,
+    ttl_seconds=RAG_SEMANTIC_CACHE_TTL_SECONDS,
+)
+
+
+# ============================================================================
+# QUERY EMBEDDING BATCHING
+# ============================================================================
+# BUSINESS PURPOSE: Fewer embedding round-trips under concurrent load
+#
+# Concurrent sessions each embed their query for the semantic cache; requests
+# arriving within a 30ms window (up to 16) are sent as one embedding call.
+# Below ~1 request/second queries are embedded immediately with no window.
+#
+# NOTE: Gemini generation calls are not coalesced - generate_content treats
+# multiple contents as one conversation, so there is no multi-request batch to
+# merge them into. Shared-prefix reuse for those calls comes from the explicit
+# context cache instead.
+# ============================================================================
+
+
+async def _embed_query_batch(queries: List[str]) -> List[List[float]]:
+    from .rag.retrieval import embed_queries
+
+    return await embed_queries(queries)
+
+
+query_embedder: BatchCoalescer[str, List[float]] = BatchCoalescer(
+    _embed_query_batch,
+    max_batch_size=16,
+    window_seconds=0.03,
+    min_qps=1.0,
+)
+
+
+# Set once _clear_semantic_caches is registered as an index-refresh callback
+# (deferred because rag.retrieval imports cognee)
+_semantic_cache_invalidation_registered = False
+
+
+def _clear_semantic_caches() -> None:
+    """Drop cached RAG output and cached responses after the knowledge base changes."""
+    rag_semantic_cache.clear()
+    response_cache.clear()
+
+
+# Normalized query text -> embedding, least recently used first. Repeated
+# questions (and the RAG tool re-searching the user's own wording) skip the
+# embedding call entirely; embeddings do not depend on the knowledge base, so
+# this survives index refreshes.
+QUERY_EMBEDDING_CACHE_MAX_ENTRIES = 4096
+_query_embeddings: "OrderedDict[str, List[float]]" = OrderedDict()
+
+
+def _normalize_query(query: str) -> str:
+    """Lowercase `query` and collapse whitespace."""
+    return " ".join(query.lower().split())
+
+
+async def _embed_for_cache(query: str) -> Optional[List[float]]:
+    """Embed `query` for semantic cache lookup; None disables the cache for this call."""
+    global _semantic_cache_invalidation_registered
+
+    key = _normalize_query(query)
+    embedding = _query_embeddings.get(key)
+    if embedding is not None:
+        _query_embeddings.move_to_end(key)
+        return embedding
+
+    # Any failure (Cognee missing or misconfigured, embedding call failed) is a cache miss
+    try:
+        from .rag.retrieval import on_index_refresh
+
+        if not _semantic_cache_invalidation_registered:
+            on_index_refresh(_clear_semantic_caches)
+            _semantic_cache_invalidation_registered = True
+
+        _configure_cognee()
+        embedding = await query_embedder.submit(query)
+    except Exception as e:
+        logger.warning("Query embedding for semantic cache failed: %s", e)
+        return None
+
+    _query_embeddings[key] = embedding
+    if len(_query_embeddings) > QUERY_EMBEDDING_CACHE_MAX_ENTRIES:
+        _query_embeddings.popitem(last=False)
+    return embedding
+
+
+# invocation id -> embedding of the user message (None if embedding failed);
+# shared by the response cache and intent cache lookups within one turn
+_message_embeddings: Dict[str, Optional[List[float]]] = {}
+
+
+async def _embed_message(callback_context: CallbackContext) -> Optional[List[float]]:
+    """Embed this invocation's user message once, for every semantic cache that needs it."""
+    invocation_id = callback_context.invocation_id
+    if invocation_id not in _message_embeddings:
+        _message_embeddings[invocation_id] = await _embed_for_cache(_user_message_text(callback_context))
+    return _message_embeddings[invocation_id]
+
+
+async def discard_message_embedding(callback_context: CallbackContext) -> None:
+    """
+    Drop this invocation's memoized message embedding.
+
+    Args:
+        callback_context: Callback context for the root agent invocation
+    """
+    _message_embeddings.pop(callback_context.invocation_id, None)
+    return None
+
+
+# Set once Cognee has been configured for this process
+_cognee_configured = False
+
+
+def _configure_cognee() -> None:
+    """
+    Configure Cognee RAG system with the OpenAI key from the environment, once per process.
+
+    BUSINESS DECISION: OpenAI used for embeddings/RAG processing (separate from Gemini agent LLM)
+    REASON: OpenAI embeddings proven reliable for financial document retrieval
+    MODEL: gpt-4o-mini chosen for cost-effective embedding generation
+
+    PERFORMANCE: Configuration runs on the first RAG call only, so later calls reuse
+    Cognee's already-configured clients (and their connection pools) instead of
+    reconfiguring them on every turn. Restart the process to pick up a new API key.
+    """
+    global _cognee_configured
+
+    if _cognee_configured:
+        return
+
+    import cognee
+
+    api_key = os.getenv("OPENAI_API_KEY")
+    if api_key:
+        os.environ["LLM_API_KEY"] = api_key
+        cognee.config.llm_api_key = api_key
+        cognee.config.set_llm_api_key(api_key)
+        cognee.config.set_llm_provider("openai")
+        cognee.config.set_llm_model("gpt-4o-mini")
+    _cognee_configured = True
+
+
+def _user_message_text(callback_context: CallbackContext) -> str:
+    """Return the plain text of the user message that started this invocation."""
+    content = callback_context.user_content
+    if not content or not content.parts:
+        return ""
+    return " ".join(part.text for part in content.parts if part.text).strip()
+
+
+async def _prefetch_search(query: str, limit: int) -> List[dict]:
+    from .rag.retrieval import search_knowledge
+
+    _configure_cognee()
+    return await search_knowledge(query, limit=limit, search_type="summaries")
+
+
+def _cancel_rag_prefetch(invocation_id: str) -> None:
+    entry = _rag_prefetch.pop(invocation_id, None)
+    if entry is not None and not entry[2].done():
+        entry[2].cancel()
+
+
+async def start_rag_prefetch(callback_context: CallbackContext) -> None:
+    """
+    Start a speculative RAG search for the user message in the background.
+
+    Args:
+        callback_context: Callback context for the root agent invocation
+    """
+    _ensure_rag_warmup()
+
+    query = _user_message_text(callback_context)
+    if not query or _rag_prefetch_slots.locked() or _answered_by_fast_path(query):
+        return None
+
+    await _rag_prefetch_slots.acquire()
+    task = asyncio.create_task(_prefetch_search(query, RAG_RESULT_LIMIT))
+    # Released on completion *or* cancellation, including a task cancelled before its first step
+    task.add_done_callback(lambda _: _rag_prefetch_slots.release())
+    _rag_prefetch[callback_context.invocation_id] = (query, RAG_RESULT_LIMIT, task)
+    return None
+
+
+async def discard_unneeded_rag_prefetch(callback_context: CallbackContext) -> None:
+    """
+    Cancel the speculative RAG search once intent shows it won't be used.
+
+    Args:
+        callback_context: Callback context for the intent agent
+    """
+    user_intent = callback_context.state.get("user_intent") or {}
+    if not user_intent.get("allowed", True) or user_intent.get("intent") in _NO_RAG_INTENTS:
+        _cancel_rag_prefetch(callback_context.invocation_id)
+    return None
+
+
+async def discard_rag_prefetch(callback_context: CallbackContext) -> None:
+    """
+    Cancel any speculative RAG search left unconsumed at the end of the invocation.
+
+    Args:
+        callback_context: Callback context for the root agent invocation
+    """
+    _cancel_rag_prefetch(callback_context.invocation_id)
+    return None
+
+
+async def _prefetch_matches(
+    prefetch_query: str, query: str, query_embedding: Optional[List[float]]
+) -> bool:
+    """Whether results for `prefetch_query` can stand in for a search for `query`."""
+    if _normalize_query(prefetch_query) == _normalize_query(query):
+        return True
+    if query_embedding is None:
+        return False
+    prefetch_embedding = await _embed_for_cache(prefetch_query)
+    if prefetch_embedding is None:
+        return False
+    a = np.asarray(query_embedding, dtype=np.float32)
+    b = np.asarray(prefetch_embedding, dtype=np.float32)
+    norms = float(np.linalg.norm(a) * np.linalg.norm(b))
+    return norms > 0 and float(a @ b) / norms >= RAG_PREFETCH_MIN_SIMILARITY
+
+
+async def _take_rag_prefetch(
+    tool_context: Optional[ToolContext],
+    query: str,
+    limit: int,
+    query_embedding: Optional[List[float]] = None,
+) -> Optional[Tuple[str, List[dict]]]:
+    """
+    Consume this invocation's prefetched search if it answers `query`.
+
+    The prefetch searched the raw user message; the agent usually rewrites it, so
+    the results are only reused when the two queries match after normalization or
+    their embeddings are nearly identical. Otherwise the prefetch is left for the
+    root agent's after-callback to cancel and the caller runs its own search.
+
+    Args:
+        tool_context: Tool context of the search_documents call
+        query: Query the agent asked for
+        limit: Requested number of results
+        query_embedding: Embedding of `query`, if already computed
+
+    Returns:
+        (prefetched query, results), or None if the prefetch can't be used
+    """
+    if tool_context is None:
+        return None
+    entry = _rag_prefetch.get(tool_context.invocation_id)
+    if entry is None or entry[1] != limit:
+        return None
+    if not await _prefetch_matches(entry[0], query, query_embedding):
+        return None
+    # Re-check: another tool call may have consumed the entry while embedding
+    if _rag_prefetch.get(tool_context.invocation_id) is not entry:
+        return None
+    del _rag_prefetch[tool_context.invocation_id]
+    prefetch_query, _, task = entry
+    try:
+        return prefetch_query, await task
+    except asyncio.CancelledError:
+        if task.cancelled():
+            return None
+        raise
+
+
+# ============================================================================
+# RAG WARMUP
+# ============================================================================
+# BUSINESS PURPOSE: Keep Cognee cold-start off the first user's critical path
+#
+# The first search in a process opens the vector/graph stores and creates the
+# embedding client. A few representative searches are run in the background as
+# soon as an event loop is available: at import when the agent is loaded inside
+# a running loop (adk web / api_server), otherwise on the first invocation.
+#
+# Warmup runs on the serving event loop rather than a separate thread with its
+# own loop, because Cognee's async clients are bound to the loop that created them.
+# Requests never wait for warmup - a concurrent first search simply shares the
+# initialization that warmup already started.
+# ============================================================================
+
+RAG_WARMUP_ENABLED = os.environ.get("RAG_WARMUP_ENABLED", "true").lower() == "true"
+
+RAG_WARMUP_QUERIES = [
+    "top innovation countries",
+    "Global Innovation Index ranking",
+    "innovation inputs and outputs",
+    "science and technology clusters",
+    "innovation by income group",
+]
+
+_rag_warmup_task: Optional[asyncio.Task] = None
+
+
+async def _warm_rag() -> None:
+    from .rag.retrieval import search_knowledge
+
+    _configure_cognee()
+    for query in RAG_WARMUP_QUERIES:
+        await search_knowledge(query, limit=1, search_type="summaries")
+    logger.info("RAG warmup complete (%d queries)", len(RAG_WARMUP_QUERIES))
+
+
+def _ensure_rag_warmup() -> None:
+    """Start RAG warmup on the running event loop, once per process."""
+    global _rag_warmup_task
+
+    if not RAG_WARMUP_ENABLED or _rag_warmup_task is not None:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    _rag_warmup_task = loop.create_task(_warm_rag())
+
+
+# Keys checked (in order) for result text across Cognee search types
+_RESULT_TEXT_KEYS = ("text", "content", "summary")
+
+
+def _result_text(result) -> str:
+    """Return the text of a Cognee result, trying each known key in order."""
+    if not isinstance(result, dict):
+        return str(result)
+    for key in _RESULT_TEXT_KEYS:
+        value = result.get(key)
+        if value:
+            return value
+    return str(result)
+
+
+def _result_text_extractor(first_result):
+    """
+    Pick a text extractor for a result set based on its first result.
+
+    A search returns results of one shape, so the populated key is detected
+    once and looked up directly for the rest; results missing it fall back
+    to the full key chain.
+
+    Args:
+        first_result: First result returned by search_knowledge
+
+    Returns:
+        Callable mapping a result to its text
+    """
+    if not isinstance(first_result, dict):
+        return _result_text
+
+    key = next((key for key in _RESULT_TEXT_KEYS if first_result.get(key)), None)
+    if key is None:
+        return _result_text
+
+    def extract(result) -> str:
+        if isinstance(result, dict):
+            value = result.get(key)
+            if value:
+                return value
+        return _result_text(result)
+
+    return extract
+
+
 # ============================================================================
 # RAG TOOL: search_documents
 # ============================================================================
@@ -79,129 +729,554 @@ MODEL_NAME = os.environ.get("GEMINI_MODEL", "gemini-2.5-flash")
 # 4. Ground Truth Constraint: Agent outputs (voice, text, follow_ups) must ALL
 #    be derived from RAG tool output - NEVER use pre-trained knowledge
 #
-# CRITICAL CONSTRAINT:
-# The agent must NOT generate information not present in search results. This includes:
-# - Voice responses must only reference retrieved content
-# - Text responses must only cite retrieved documents
-# - Follow-up questions must only cover topics the RAG tool can handle
-# - No hallucination or speculation beyond document content
+# CRITICAL CONSTRAINT:
+# The agent must NOT generate information not present in search results. This includes:
+# - Voice responses must only reference retrieved content
+# - Text responses must only cite retrieved documents
+# - Follow-up questions must only cover topics the RAG tool can handle
+# - No hallucination or speculation beyond document content
+#
+# FUTURE EXTENSIBILITY:
+# Currently single tool (search_documents), but architecture supports adding:
+# - Document comparison tools
+# - Metadata query tools
+# - Multi-document aggregation tools
+# ============================================================================
+
+async def search_documents(
+    query: str,
+    limit: int = RAG_RESULT_LIMIT,
+    tool_context: ToolContext = None
+) -> str:
+    """
+    Search the knowledge base for relevant information about innovation, rankings, and related topics.
+
+    This tool queries the Global Innovation Index database to find information about:
+    - Innovation metrics and rankings
+    - Country-specific innovation data
+    - Technology and research insights
+    - Economic and development indicators
+
+    BUSINESS CONSTRAINTS:
+    - All agent responses MUST be grounded in results from this tool
+    - No fabrication or hallucination allowed
+    - If no results found, agent must explicitly state this and escalate
+    - Document citations required for all factual claims
+
+    VALIDATION INTEGRATION:
+    - Tool output is stored in temp:last_rag_output for validation agent access
+    - Temp state persists across loop iterations within same invocation
+    - Automatically cleared between user messages
+
+    SPECULATIVE PREFETCH:
+    - A call whose query matches the raw user message (or is nearly identical by
+      embedding) reuses the search started in parallel with intent classification
+
+    REQUEST-SCOPED MEMOIZATION:
+    - Formatted output is memoized in temp:rag_cache keyed by normalized query + limit
+    - Repeated lookups in the same invocation (retry loop iterations, self-reflection)
+      return the memoized output without hitting Cognee again
+
+    SEMANTIC CACHE:
+    - Across sessions, queries semantically similar to a previous one (same limit)
+      return that query's formatted output from rag_semantic_cache
+
+    Args:
+        query: The search query describing what information you're looking for
+        limit: Maximum number of results to return (default: 5)
+        tool_context: Tool context for state management (provided by ADK framework)
+
+    Returns:
+        A formatted string containing the search results with relevant information
+    """
+    from .rag.retrieval import search_knowledge
+
+    # Return memoized output for a repeated lookup within this invocation
+    memo_key = f"{limit}:{query.strip().lower()}"
+    if tool_context:
+        memoized = (tool_context.state.get("temp:rag_cache") or {}).get(memo_key)
+        if memoized is not None:
+            _store_rag_output(tool_context, memo_key, memoized["query"], memoized["output"])
+            return memoized["output"]
+
+    # Serve semantically similar queries from the cross-session cache
+    # A failed lookup (embedding or cache) is a miss, never a tool error
+    query_embedding = await _embed_for_cache(query) if RAG_SEMANTIC_CACHE_TTL_SECONDS > 0 else None
+    if query_embedding is not None:
+        try:
+            cached = rag_semantic_cache.get(query_embedding)
+        except Exception as e:
+            logger.warning("Semantic RAG cache lookup failed: %s", e)
+            cached = query_embedding = None
+        if cached is not None and cached["limit"] == limit:
+            logger.info("Semantic RAG cache hit for %r (cached query %r)", query, cached["query"])
+            if tool_context:
+                _store_rag_output(tool_context, memo_key, cached["query"], cached["output"])
+            return cached["output"]
+
+    # Reuse the speculative search started alongside intent classification, if any
+    # The prefetch query (raw user message) is what was actually searched, so it is
+    # the one reported in the output and temp:rag_query, and the memo and semantic
+    # cache entries are keyed by it rather than by the requested wording
+    prefetched = await _take_rag_prefetch(tool_context, query, limit, query_embedding)
+    if prefetched is not None:
+        searched_query, results = prefetched
+        if searched_query != query:
+            query = searched_query
+            memo_key = f"{limit}:{query.strip().lower()}"
+            if query_embedding is not None:
+                query_embedding = await _embed_for_cache(query)
+    else:
+        # Execute RAG search
+        # SEARCH_TYPE: "summaries" chosen for processed, relevant information vs raw chunks
+        # BUSINESS REASON: Summaries provide better context for agent to generate concise responses
+        _configure_cognee()
+        results = await search_knowledge(query, limit=limit, search_type="summaries")
+
+    # Handle no results case - CRITICAL for compliance
+    # Agent MUST explicitly state when information is not available (no fabrication allowed)
+    if not results:
+        formatted_output = f"No information found for query: '{query}'"
+
+        # Store in temp state for validator access
+        if tool_context:
+            _store_rag_output(tool_context, memo_key, query, formatted_output)
+
+        return formatted_output
+
+    # Format results for agent consumption
+    # BUSINESS REQUIREMENT: Clear, structured format enables accurate citation and response generation
+    # Collect parts and join once (avoids re-copying the output on every append)
+    parts = [f"Information about '{query}':"]
+
+    # Flexible key handling for different Cognee result formats, resolved once per result set
+    # FUTURE EXTENSIBILITY: Supports different search_type outputs (summaries, chunks, natural_language)
+    extract_text = _result_text_extractor(results[0])
+
+    for result in results:
+        text = extract_text(result)
+
+        # Quality filter: Only include non-empty results
+        # BUSINESS REASON: Prevents agent from processing empty/null content
+        if text and len(text.strip()) > 0:
+            parts.append(text)
+
+    formatted_output = "\n\n".join(parts).strip()
+
+    if query_embedding is not None:
+        try:
+            rag_semantic_cache.put(query_embedding, {"query": query, "limit": limit, "output": formatted_output})
+        except Exception as e:
+            logger.warning("Semantic RAG cache store failed: %s", e)
+
+    # Store formatted output in temp state for validator agent access
+    # VALIDATION INTEGRATION:
+    # - temp: prefix ensures state is cleared between user messages
+    # - Persists across loop iterations within same invocation
+    # - Validator agent reads this to check response grounding
+    if tool_context:
+        _store_rag_output(tool_context, memo_key, query, formatted_output)
+
+    return formatted_output
+
+
+def _store_rag_output(tool_context: ToolContext, memo_key: str, query: str, formatted_output: str) -> None:
+    """
+    Publish a search_documents result to temp state for the validator and memoize it.
+
+    Args:
+        tool_context: Tool context for state management
+        memo_key: temp:rag_cache key for the requested query and limit
+        query: Query that was actually searched
+        formatted_output: Formatted tool output returned to the agent
+    """
+    state = tool_context.state
+    state["temp:last_rag_output"] = formatted_output
+    state["temp:rag_query"] = query
+
+    # Reassign rather than mutate so the change is recorded in the state delta
+    rag_cache = dict(state.get("temp:rag_cache") or {})
+    rag_cache[memo_key] = {"query": query, "output": formatted_output}
+    state["temp:rag_cache"] = rag_cache
+
+    # Initialize all template variables to prevent KeyError
+    # ADK substitutes template variables before evaluating conditionals
+    _ensure_temp_state(state)
+
+# ============================================================================
+# CALLBACK: Intent Fast Path
+# ============================================================================
+# BUSINESS PURPOSE: Classify unambiguous messages without an LLM call
+#
+# RULES (compiled once at import):
+# - The classifier prompt's own examples (INTENT_EXACT_CACHE in prompt.py) → their label
+# - Bare greetings ("hi", "hello there", "good morning!") → greet
+# - Requests for help committing a crime ("how do I launder money", "help me
+#   evade taxes") → out_of_scope, allowed=false
+# - Anything else → None (falls through to the LLM classifier)
+#
+# The rules are deliberately narrow: a message is only fast-pathed when the LLM
+# classifier would certainly agree (pure greetings have no other content, and
+# the blocklist only matches a first-person request phrasing followed directly
+# by the illegal act). Messages that merely mention a topic - "what is money
+# laundering?", "how does the bank detect phishing emails?" - are legitimate
+# questions and go to the classifier.
+# ============================================================================
+
+_GREETING_PATTERN = re.compile(
+    r"^\s*(hi|hello|hey|hiya|greetings|good (morning|afternoon|evening|day))"
+    r"( there| avery)?\s*[.!]*\s*$",
+    re.IGNORECASE,
+)
+
+_BLOCKLIST_PATTERN = re.compile(
+    r"\b("
+    # Request phrasing...
+    r"(how|where) (do|can|could|should|would) (i|we)|"
+    r"(can|could|will|would) you (help me|show me how to|teach me( how)? to|tell me how to)|"
+    r"help me|show me how to|teach me( how)? to|"
+    r"i (want|need|would like|'d like) to"
+    r") "
+    # ...directly followed by the illegal act
+    r"(hack into|launder (money|funds|cash)|"
+    r"steal (money|funds|an identity|someone's identity)|"
+    r"(create|write|build|make|send) (a |an )?(phishing (email|site|page)|ransomware|malware)|"
+    r"(make|print) counterfeit (money|bills|currency)|"
+    r"evade (taxes|sanctions)|bypass (kyc|aml|sanctions)"
+    r")\b",
+    re.IGNORECASE,
+)
+
+
+def _fast_intent(query: str) -> Optional[IntentGuardrailOutput]:
+    """
+    Classify `query` by rule if it is unambiguous.
+
+    Args:
+        query: Raw user message
+
+    Returns:
+        IntentGuardrailOutput for known examples / greetings / blocklisted requests, otherwise None
+    """
+    known = INTENT_EXACT_CACHE.get(normalize_intent_message(query))
+    if known is not None:
+        return IntentGuardrailOutput(query=query, **known)
+
+    if _GREETING_PATTERN.match(query):
+        return IntentGuardrailOutput(
+            query=query,
+            intent=IntentCategory.GREET,
+            reasoning="The message is a simple greeting with no specific question or request (rule-based match).",
+            confidence=1.0,
+            allowed=True,
+        )
+
+    match = _BLOCKLIST_PATTERN.search(query)
+    if match:
+        return IntentGuardrailOutput(
+            query=query,
+            intent=IntentCategory.OUT_OF_SCOPE,
+            reasoning=f"The message requests prohibited activity ('{match.group(0)}') and cannot be supported by a bank representative (rule-based match).",
+            confidence=1.0,
+            allowed=False,
+        )
+
+    return None
+
+
+def _answered_by_fast_path(message: str) -> bool:
+    """
+    Whether the intent fast path answers `message` with a canned response.
+
+    Greetings and blocklisted requests never need RAG or the response cache, so
+    the root agent's callbacks skip the speculative search and the message
+    embedding for them - such turns don't touch Cognee at all.
+    """
+    result = _fast_intent(message)
+    return result is not None and (not result.allowed or result.intent.value in _NO_RAG_INTENTS)
+
+
+async def classify_intent_fast_path(callback_context: CallbackContext) -> Optional[types.Content]:
+    """
+    Skip the intent LLM call for messages the fast-path rules can classify.
+
+    Args:
+        callback_context: Callback context for the intent agent
+
+    Returns:
+        Classification Content to skip intent_agent, None to run the LLM classifier
+    """
+    result = _fast_intent(_user_message_text(callback_context))
+    if result is None:
+        return None
+
+    # Same state shape the LLM classifier writes via output_key
+    callback_context.state["user_intent"] = result.model_dump(mode="json")
+
+    # after_agent_callback does not run for a skipped agent
+    await discard_unneeded_rag_prefetch(callback_context)
+
+    return types.Content(role="model", parts=[types.Part(text=result.model_dump_json())])
+
+
+# ============================================================================
+# CALLBACK: Intent Cache
+# ============================================================================
+# BUSINESS PURPOSE: Skip the intent LLM call for messages classified before
+#
+# Repeated phrasings (greetings the fast path doesn't cover, common FAQ wording)
+# get the same classification every time at temperature 0.1, so the first LLM
+# result is reused. Two tiers:
+# - Exact: SHA256 of the normalized message; LRU-bounded
+# - Semantic: near-duplicate phrasings ("what's your name" / "what is your name?")
+#   found by embedding similarity >= 0.95, reusing the turn's message embedding
+#   (already computed for the response cache)
+#
+# NOT CACHED:
+# - Messages that refer back to earlier turns ("tell me more about that"):
+#   their intent depends on the conversation, not just the message
+# - Low-confidence classifications (< 0.7), which may deserve a second look
+# ============================================================================
+
+INTENT_CACHE_MAX_ENTRIES = 10_000
+INTENT_CACHE_MIN_CONFIDENCE = 0.7
+
+# sha256(normalized message) -> IntentGuardrailOutput JSON, oldest first
+_intent_cache: "OrderedDict[str, str]" = OrderedDict()
+
+# Intent labels don't depend on the knowledge base, so this cache is not cleared on re-ingest
+INTENT_SEMANTIC_CACHE_TTL_SECONDS = float(os.environ.get("INTENT_SEMANTIC_CACHE_TTL_SECONDS", str(24 * 3600)))
+intent_semantic_cache = SemanticCache(
+    threshold=0.95,
+    num_tables=8,
+    hash_bits=16,
+    max_entries=INTENT_CACHE_MAX_ENTRIES,
+    ttl_seconds=INTENT_SEMANTIC_CACHE_TTL_SECONDS,
+)
+
+# Messages that refer back to earlier turns and so cannot be answered from a cache
+_CONTEXT_DEPENDENT_PATTERN = re.compile(
+    r"\b(it|its|that|this|those|these|they|them|their|more|else|above|previous|earlier|again|same)\b",
+    re.IGNORECASE,
+)
+
+
+def _intent_cache_key(message: str) -> Optional[str]:
+    """Cache key for `message`, or None if its intent may depend on earlier turns."""
+    normalized = message.strip().lower()
+    if not normalized or _CONTEXT_DEPENDENT_PATTERN.search(normalized):
+        return None
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
+async def serve_cached_intent(callback_context: CallbackContext) -> Optional[types.Content]:
+    """
+    Skip the intent LLM call when the same message has been classified before.
+
+    Args:
+        callback_context: Callback context for the intent agent
+
+    Returns:
+        Classification Content to skip intent_agent, None on a cache miss
+    """
+    message = _user_message_text(callback_context)
+    key = _intent_cache_key(message)
+    if key is None:
+        return None
+
+    cached = _intent_cache.get(key)
+    if cached is not None:
+        _intent_cache.move_to_end(key)
+    elif INTENT_SEMANTIC_CACHE_TTL_SECONDS > 0:
+        embedding = await _embed_message(callback_context)
+        cached = intent_semantic_cache.get(embedding) if embedding is not None else None
+    if cached is None:
+        return None
+
+    result = IntentGuardrailOutput.model_validate_json(cached).model_copy(update={"query": message})
+    callback_context.state["user_intent"] = result.model_dump(mode="json")
+
+    # after_agent_callback does not run for a skipped agent
+    await discard_unneeded_rag_prefetch(callback_context)
+
+    return types.Content(role="model", parts=[types.Part(text=result.model_dump_json())])
+
+
+async def cache_intent(callback_context: CallbackContext) -> None:
+    """
+    Remember the LLM classifier's result for this message.
+
+    Args:
+        callback_context: Callback context for the intent agent
+    """
+    key = _intent_cache_key(_user_message_text(callback_context))
+    user_intent = callback_context.state.get("user_intent")
+    if key is None or not isinstance(user_intent, dict):
+        return None
+    try:
+        result = IntentGuardrailOutput.model_validate(user_intent)
+    except ValidationError:
+        return None
+    if result.confidence < INTENT_CACHE_MIN_CONFIDENCE:
+        return None
+
+    serialized = result.model_dump_json()
+    _intent_cache[key] = serialized
+    _intent_cache.move_to_end(key)
+    while len(_intent_cache) > INTENT_CACHE_MAX_ENTRIES:
+        _intent_cache.popitem(last=False)
+
+    if INTENT_SEMANTIC_CACHE_TTL_SECONDS > 0:
+        embedding = await _embed_message(callback_context)
+        if embedding is not None:
+            intent_semantic_cache.put(embedding, serialized)
+    return None
+
+
+# ============================================================================
+# CALLBACK: Local Intent Classifier
+# ============================================================================
+# BUSINESS PURPOSE: Replace the intent LLM call with a millisecond CPU model
+#
+# When INTENT_CLASSIFIER_MODEL_DIR points at an exported ONNX sequence
+# classifier (see intent_classifier.py), confident predictions (top-1
+# probability >= INTENT_CLASSIFIER_MIN_CONFIDENCE, default 0.6) are used
+# directly and intent_agent is skipped; anything less confident falls through
+# to the batched / LLM classifier. Disabled when no model is configured.
 #
-# FUTURE EXTENSIBILITY:
-# Currently single tool (search_documents), but architecture supports adding:
-# - Document comparison tools
-# - Metadata query tools
-# - Multi-document aggregation tools
+# Like the intent cache, only messages whose intent does not depend on earlier
+# turns are classified locally - the classifier sees the message alone.
 # ============================================================================
 
-async def search_documents(
-    query: str,
-    limit: int = 5,
-    tool_context: ToolContext = None
-) -> str:
-    """
-    Search the knowledge base for relevant information about innovation, rankings, and related topics.
-
-    This tool queries the Global Innovation Index database to find information about:
-    - Innovation metrics and rankings
-    - Country-specific innovation data
-    - Technology and research insights
-    - Economic and development indicators
+intent_classifier = load_intent_classifier()
 
-    BUSINESS CONSTRAINTS:
-    - All agent responses MUST be grounded in results from this tool
-    - No fabrication or hallucination allowed
-    - If no results found, agent must explicitly state this and escalate
-    - Document citations required for all factual claims
 
-    VALIDATION INTEGRATION:
-    - Tool output is stored in temp:last_rag_output for validation agent access
-    - Temp state persists across loop iterations within same invocation
-    - Automatically cleared between user messages
+async def classify_intent_locally(callback_context: CallbackContext) -> Optional[types.Content]:
+    """
+    Skip the intent LLM call when the local classifier is confident.
 
     Args:
-        query: The search query describing what information you're looking for
-        limit: Maximum number of results to return (default: 5)
-        tool_context: Tool context for state management (provided by ADK framework)
+        callback_context: Callback context for the intent agent
 
     Returns:
-        A formatted string containing the search results with relevant information
+        Classification Content to skip intent_agent, None to run the LLM classifier
     """
-    # Configure Cognee RAG system
-    # BUSINESS DECISION: OpenAI used for embeddings/RAG processing (separate from Gemini agent LLM)
-    # REASON: OpenAI embeddings proven reliable for financial document retrieval
-    # MODEL: gpt-4o-mini chosen for cost-effective embedding generation
-    import cognee
-    from .rag.retrieval import search_knowledge
+    if intent_classifier is None:
+        return None
+    message = _user_message_text(callback_context)
+    if _intent_cache_key(message) is None:
+        return None
 
-    api_key = os.getenv("OPENAI_API_KEY")
-    if api_key:
-        os.environ["LLM_API_KEY"] = api_key
-        cognee.config.llm_api_key = api_key
-        cognee.config.set_llm_api_key(api_key)
-        cognee.config.set_llm_provider("openai")
-        cognee.config.set_llm_model("gpt-4o-mini")
+    result = await intent_classifier.classify(message)
+    if result is None:
+        return None
+    callback_context.state["user_intent"] = result.model_dump(mode="json")
 
-    # Execute RAG search
-    # SEARCH_TYPE: "summaries" chosen for processed, relevant information vs raw chunks
-    # BUSINESS REASON: Summaries provide better context for agent to generate concise responses
-    results = await search_knowledge(query, limit=limit, search_type="summaries")
+    # after_agent_callback does not run for a skipped agent
+    await discard_unneeded_rag_prefetch(callback_context)
 
-    # Handle no results case - CRITICAL for compliance
-    # Agent MUST explicitly state when information is not available (no fabrication allowed)
-    if not results:
-        formatted_output = f"No information found for query: '{query}'"
+    return types.Content(role="model", parts=[types.Part(text=result.model_dump_json())])
 
-        # Store in temp state for validator access
-        if tool_context:
-            tool_context.state["temp:last_rag_output"] = formatted_output
-            tool_context.state["temp:rag_query"] = query
-            # Initialize retry counter if first call
-            if "temp:retry_count" not in tool_context.state:
-                tool_context.state["temp:retry_count"] = 0
 
-        return formatted_output
+# ============================================================================
+# CALLBACK: Batched Intent Classification
+# ============================================================================
+# BUSINESS PURPOSE: Amortize the intent prompt across concurrent sessions
+#
+# Under bursty traffic, messages arriving within 15 ms of each other are
+# classified by ONE model call that lists all of them and returns a JSON array,
+# so INTENT_AGENT_PROMPT is prefilled once per batch instead of once per user.
+# At low traffic (< 2 messages/s) BatchCoalescer passes messages straight
+# through and a single message is left to intent_agent's own LLM call, so
+# quiet periods pay no batching delay.
+#
+# ONLY BATCHED:
+# - Messages whose intent does not depend on earlier turns (same rule as the
+#   intent cache), since the batched call sees each message without history
+#
+# FALLBACK: Any message the batch result does not cleanly cover (call failed,
+# wrong array length, echoed query mismatch, or no result within
+# INTENT_BATCH_TIMEOUT_SECONDS) falls through to intent_agent.
+# ============================================================================
 
-    # Format results for agent consumption
-    # BUSINESS REQUIREMENT: Clear, structured format enables accurate citation and response generation
-    formatted_output = f"Information about '{query}':\n\n"
+# Upper bound on waiting for a batch; a stuck batch must not hold up the turn
+INTENT_BATCH_TIMEOUT_SECONDS = 5.0
+
+_intent_batch_adapter = TypeAdapter(List[IntentGuardrailOutput])
+# Only used for its client, so the batched call shares intent_agent's connection pool
+_intent_batch_model = _gemini(INTENT_MODEL_NAME)
+
+
+async def _classify_intent_batch(messages: List[str]) -> List[Optional[IntentGuardrailOutput]]:
+    """Classify several messages in one model call; None for any message left to intent_agent."""
+    if len(messages) < 2:
+        return [None] * len(messages)
+
+    numbered = "\n".join(f"{i}) {json.dumps(message)}" for i, message in enumerate(messages, 1))
+    try:
+        response = await _intent_batch_model.api_client.aio.models.generate_content(
+            model=INTENT_MODEL_NAME,
+            contents=(
+                f"Classify each of these {len(messages)} independent user messages.\n"
+                f"Messages:\n{numbered}\n"
+                f"Respond with a JSON array of {len(messages)} classifications in the same order, "
+                "each with \"query\" set to the message exactly as given."
+            ),
+            config=types.GenerateContentConfig(
+                system_instruction=INTENT_AGENT_PROMPT,
+                temperature=0.1,
+                response_mime_type="application/json",
+                response_schema=list[IntentGuardrailOutput],  # google-genai rejects typing.List here
+            ),
+        )
+        results = _intent_batch_adapter.validate_json(response.text or "")
+    except Exception as e:
+        logger.warning("Batched intent classification of %d messages failed: %s", len(messages), e)
+        return [None] * len(messages)
+
+    if len(results) != len(messages):
+        logger.warning("Batched intent classification returned %d results for %d messages", len(results), len(messages))
+        return [None] * len(messages)
+    return [result if result.query.strip() == message.strip() else None for message, result in zip(messages, results)]
+
+
+intent_batcher: BatchCoalescer[str, Optional[IntentGuardrailOutput]] = BatchCoalescer(
+    _classify_intent_batch,
+    max_batch_size=16,
+    window_seconds=0.015,
+    min_qps=2.0,
+)
 
-    for idx, result in enumerate(results, 1):
-        # Flexible key handling for different Cognee result formats
-        # FUTURE EXTENSIBILITY: Supports different search_type outputs (summaries, chunks, natural_language)
-        if isinstance(result, dict):
-            text = (result.get('text') or
-                   result.get('content') or
-                   result.get('summary') or
-                   str(result))
-        else:
-            text = str(result)
 
-        # Quality filter: Only include non-empty results
-        # BUSINESS REASON: Prevents agent from processing empty/null content
-        if text and len(text.strip()) > 0:
-            formatted_output += f"{text}\n\n"
+async def classify_intent_batched(callback_context: CallbackContext) -> Optional[types.Content]:
+    """
+    Classify the message as part of a batch of concurrent sessions' messages.
 
-    formatted_output = formatted_output.strip()
+    Args:
+        callback_context: Callback context for the intent agent
 
-    # Store formatted output in temp state for validator agent access
-    # VALIDATION INTEGRATION:
-    # - temp: prefix ensures state is cleared between user messages
-    # - Persists across loop iterations within same invocation
-    # - Validator agent reads this to check response grounding
-    if tool_context:
-        tool_context.state["temp:last_rag_output"] = formatted_output
-        tool_context.state["temp:rag_query"] = query
-
-        # Initialize all template variables to prevent KeyError
-        # ADK substitutes template variables before evaluating conditionals
-        if "temp:retry_count" not in tool_context.state:
-            tool_context.state["temp:retry_count"] = 0
-        if "temp:validation_feedback" not in tool_context.state:
-            tool_context.state["temp:validation_feedback"] = ""
-        if "temp:is_valid" not in tool_context.state:
-            tool_context.state["temp:is_valid"] = False
+    Returns:
+        Classification Content to skip intent_agent, None to run the LLM classifier
+    """
+    message = _user_message_text(callback_context)
+    if _intent_cache_key(message) is None:
+        return None
+
+    try:
+        result = await asyncio.wait_for(intent_batcher.submit(message), INTENT_BATCH_TIMEOUT_SECONDS)
+    except Exception as e:
+        logger.warning("Batched intent classification unavailable (%r); using intent_agent", e)
+        return None
+    if result is None:
+        return None
+    callback_context.state["user_intent"] = result.model_dump(mode="json")
+
+    # after_agent_callback does not run for a skipped agent
+    await discard_unneeded_rag_prefetch(callback_context)
+    await cache_intent(callback_context)
+
+    return types.Content(role="model", parts=[types.Part(text=result.model_dump_json())])
 
-    return formatted_output
 
 # ============================================================================
 # AGENT 1: INTENT CLASSIFICATION AGENT
@@ -240,10 +1315,10 @@ async def search_documents(
 # - Enables clean agent separation without explicit handoffs
 # ============================================================================
 intent_agent = LlmAgent(
-    model=MODEL_NAME,
+    model=_gemini(INTENT_MODEL_NAME),
     name="intent_agent",
     description="Classifies the user's intent.",
-    instruction=INTENT_AGENT_PROMPT,  # See prompt.py for detailed classification rules
+    instruction=INTENT_AGENT_INSTRUCTION,  # See prompt.py for detailed classification rules
     output_schema=IntentGuardrailOutput,  # Structured output for validation and audit
     output_key="user_intent",  # Save to session state for downstream agent consumption
 
@@ -254,6 +1329,26 @@ intent_agent = LlmAgent(
     # - Risk Mitigation: Minimize unpredictable classifications in regulated domain
     # - Brand Voice Consistency: Maintain consistent intent detection across interactions
     generate_content_config=types.GenerateContentConfig(temperature=0.1),
+
+    # CALLBACKS: Serve the static prefix from an explicit context cache, then
+    # log cached vs uncached prompt tokens to confirm cache hits
+    before_model_callback=use_context_cache,
+    after_model_callback=log_prompt_cache_usage,
+
+    # CALLBACKS: Classify unambiguous greetings / prohibited requests by rule, reuse
+    # earlier classifications of the same message, ask the local classifier (if
+    # configured), then join a batch with concurrent sessions under load; any of
+    # these skips this agent's own LLM call
+    before_agent_callback=[
+        classify_intent_fast_path,
+        serve_cached_intent,
+        classify_intent_locally,
+        classify_intent_batched,
+    ],
+
+    # CALLBACKS: Drop the speculative RAG search for greetings / disallowed requests,
+    # then remember this classification for repeats of the message
+    after_agent_callback=[discard_unneeded_rag_prefetch, cache_intent],
 )
 
 # ============================================================================
@@ -289,19 +1384,10 @@ async def initialize_temp_state(callback_context: CallbackContext) -> None:
         callback_context: Callback context with access to session state
     """
     # Initialize temp state variables if they don't exist
-    # These are used in template variables in CONCIERGE_INSTRUCTIONS and VALIDATOR_INSTRUCTIONS
-    if "temp:retry_count" not in callback_context.state:
-        callback_context.state["temp:retry_count"] = 0
-    if "temp:validation_feedback" not in callback_context.state:
-        callback_context.state["temp:validation_feedback"] = ""
-    if "temp:is_valid" not in callback_context.state:
-        callback_context.state["temp:is_valid"] = False
-    if "temp:last_rag_output" not in callback_context.state:
-        # Initialize to empty string - will be populated by search_documents() if called
-        # For greetings/non-RAG responses, validator should handle empty RAG output appropriately
-        callback_context.state["temp:last_rag_output"] = ""
-    if "temp:rag_query" not in callback_context.state:
-        callback_context.state["temp:rag_query"] = ""
+    # These are used in template variables in CONCIERGE_RETRY_FEEDBACK and VALIDATOR_RUNTIME_STATE
+    # temp:last_rag_output stays empty until search_documents() populates it;
+    # for greetings/non-RAG responses the validator handles empty RAG output appropriately
+    _ensure_temp_state(callback_context.state)
 
     # Return None to proceed with normal agent execution
     return None
@@ -385,7 +1471,7 @@ async def initialize_temp_state(callback_context: CallbackContext) -> None:
 # - voice_str: ≤30 words, audio-optimized (BUSINESS: audio delivery constraint)
 # - text: Markdown formatted, hierarchical (BUSINESS: rich visual display)
 # - send_to_ui: Boolean gate (BUSINESS: prevent UI clutter)
-# - follow_up_questions: List[str] (BUSINESS: optional conversation deepening)
+# - follow_up_questions: Tuple[str, ...] (BUSINESS: optional conversation deepening)
 #
 # SESSION STATE:
 # - INPUT: Reads "user_intent" from session state (set by intent_agent)
@@ -394,13 +1480,15 @@ async def initialize_temp_state(callback_context: CallbackContext) -> None:
 # ============================================================================
 avery_agent = LlmAgent(
     name="avery_agent",
-    model=MODEL_NAME,
+    model=_gemini(MODEL_NAME),
     description="Friendly conversational AI that assists with user inquiries and can search the innovation knowledge base.",
 
     # Instruction includes handoff instructions to ensure unified system appearance
-    # VALIDATION: Also includes retry feedback template that reads temp:validation_feedback
+    # VALIDATION: The instruction is fully static; retry feedback (temp:validation_feedback)
+    # is added as a trailing user message by add_retry_feedback, so the instruction and
+    # conversation prefix stay byte-identical across attempts for prompt caching
     # See prompt.py for comprehensive business rules, constraints, and formatting guidelines
-    instruction=prompt_with_handoff_instructions(CONCIERGE_INSTRUCTIONS),
+    instruction=CONCIERGE_AGENT_INSTRUCTION,
 
     output_schema=AgentResponse,  # Structured output enforces voice/text separation and formatting
 
@@ -421,8 +1509,220 @@ avery_agent = LlmAgent(
     # CRITICAL: Ensures template variables exist even when search_documents() isn't called
     # (e.g., for greetings) - prevents KeyError during instruction template substitution
     before_agent_callback=initialize_temp_state,
+
+    # CALLBACKS: Add validation feedback on retries, serve the static prefix from an
+    # explicit context cache, then log cached vs uncached prompt tokens to confirm cache hits
+    before_model_callback=[add_retry_feedback, use_context_cache],
+    after_model_callback=log_prompt_cache_usage,
+)
+
+# ============================================================================
+# CALLBACK: Skip Validation for Ungrounded Intents
+# ============================================================================
+# BUSINESS PURPOSE: Avoid a validator LLM round-trip when there is nothing to ground
+#
+# - greet / out_of_scope (normally answered by route_by_intent before the loop,
+#   should one reach it): a pass verdict is synthesized
+# - general_question: agent identity and capability claims need no RAG
+#   grounding, but investment facts, statistics and document information still
+#   do. A pass is only synthesized when no search ran this turn
+#   (temp:last_rag_output is empty) and the response makes no such claim - no
+#   digits, currency or percent signs, and no fund/market vocabulary
+#   (_FACTUAL_CLAIM_PATTERN). Anything else goes to the validator LLM.
+#
+# validation_gate then exits the loop after the first iteration as usual.
+# ============================================================================
+
+_UNGROUNDED_INTENTS = {IntentCategory.GREET.value, IntentCategory.OUT_OF_SCOPE.value}
+
+_FACTUAL_CLAIM_PATTERN = re.compile(
+    r"[\d%$€£¥]|\b("
+    r"funds?|markets?|portfolios?|stocks?|shares|bonds?|equit(y|ies)|etfs?|securities|"
+    r"returns?|yields?|dividends?|interest|rates?|prices?|valuations?|earnings|"
+    r"index|indices|rank(s|ed|ing|ings)?|gdp|inflation|economy|growth|"
+    r"invest(ment|ments|ing|or|ors)?|allocation|ltcma"
+    r")\b",
+    re.IGNORECASE,
 )
 
+
+def _passing_verdict(validation_mode: str) -> Tuple[dict, str]:
+    """Passing ValidationResult as (state value for temp:validation_result, serialized verdict)."""
+    result = ValidationResult(
+        is_valid=True,
+        traceability_check=True,
+        consistency_check=True,
+        tool_usage_check=True,
+        validation_mode=validation_mode,
+        feedback="",
+        escalate=True,
+    )
+    return result.model_dump(), result.model_dump_json()
+
+
+# validation mode -> synthesized passing verdict, built once at import
+_PASSING_VERDICTS = {
+    intent: _passing_verdict(intent)
+    for intent in (
+        *_UNGROUNDED_INTENTS,
+        IntentCategory.GENERAL_QUESTION.value,
+        IntentCategory.INVESTMENT_RELATED.value,
+    )
+}
+
+
+def _makes_factual_claims(response: dict) -> bool:
+    """Whether an avery_response mentions figures or investment/document topics."""
+    parts = [response.get("voice_str") or "", response.get("text") or "", *(response.get("follow_up_questions") or [])]
+    return any(_FACTUAL_CLAIM_PATTERN.search(part) for part in parts)
+
+
+async def skip_validation_for_ungrounded_intents(callback_context: CallbackContext) -> Optional[types.Content]:
+    """
+    Synthesize a passing ValidationResult when there is nothing to ground.
+
+    Args:
+        callback_context: Callback context for the validator agent
+
+    Returns:
+        Synthetic verdict Content to skip the validator LLM call, None to run it
+    """
+    state = callback_context.state
+    intent = (state.get("user_intent") or {}).get("intent")
+    if intent == IntentCategory.GENERAL_QUESTION.value:
+        response = state.get("avery_response")
+        if state.get("temp:last_rag_output") or not isinstance(response, dict) or _makes_factual_claims(response):
+            return None
+    elif intent not in _UNGROUNDED_INTENTS:
+        return None
+
+    state_value, serialized = _PASSING_VERDICTS[intent]
+    # Same state shape the validator writes via output_key
+    state["temp:validation_result"] = state_value
+    return types.Content(role="model", parts=[types.Part(text=serialized)])
+
+
+# ============================================================================
+# CALLBACK: Deterministic Grounding Pre-Check
+# ============================================================================
+# BUSINESS PURPOSE: Pass clearly grounded investment answers without a validator LLM call
+#
+# Answers that quote the retrieved documents closely can be verified without
+# an LLM judgement:
+# - Traceability (lexical, see is_traceable in cache/grounding.py): every clause
+#   of voice_str, text and the follow-up questions is covered by ONE clause of
+#   the RAG output - its figures, names and negations verbatim and >= 80% of
+#   its content words - so facts swapped between evidence sentences fail
+# - Traceability (semantic): every sentence of voice_str and text has cosine
+#   similarity >= 0.75 with at least one retrieved chunk
+# - Consistency: every clause of voice_str is covered by text the same way
+# - Tool usage: search_documents ran this turn (temp:last_rag_output is set)
+#
+# The check can only PASS a response. Paraphrased or partially grounded answers
+# fall through to the LLM validator, which still makes every rejection and
+# writes the retry feedback - so no response is failed on a lexical heuristic.
+# ============================================================================
+
+GROUNDING_PRECHECK_MIN_COVERAGE = 0.8
+GROUNDING_PRECHECK_MIN_SIMILARITY = 0.75
+
+
+async def _semantically_grounded(sentences: List[str], chunks: List[str]) -> bool:
+    """
+    Check that every sentence has cosine similarity >= GROUNDING_PRECHECK_MIN_SIMILARITY with some chunk.
+
+    Sentences and chunks are embedded in one batch. Any embedding failure counts
+    as not grounded, so the LLM validator runs.
+
+    Args:
+        sentences: Answer sentences
+        chunks: Retrieved evidence chunks
+
+    Returns:
+        True if every sentence is close to at least one chunk
+    """
+    try:
+        from .rag.retrieval import embed_queries
+
+        _configure_cognee()
+        embeddings = np.asarray(await embed_queries(sentences + chunks), dtype=np.float32)
+    except Exception as e:
+        logger.warning("Grounding pre-check embedding failed: %s", e)
+        return False
+
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    if not np.all(norms > 0):
+        return False
+    embeddings /= norms
+    similarity = embeddings[: len(sentences)] @ embeddings[len(sentences):].T
+    return bool(similarity.max(axis=1).min() >= GROUNDING_PRECHECK_MIN_SIMILARITY)
+
+
+async def precheck_grounding(callback_context: CallbackContext) -> Optional[types.Content]:
+    """
+    Synthesize a passing ValidationResult when the response is verifiably grounded in RAG output.
+
+    Args:
+        callback_context: Callback context for the validator agent
+
+    Returns:
+        Synthetic verdict Content to skip the validator LLM call, None to run it
+    """
+    state = callback_context.state
+    intent = (state.get("user_intent") or {}).get("intent")
+    response = state.get("avery_response")
+    evidence = state.get("temp:last_rag_output") or ""
+    if intent != IntentCategory.INVESTMENT_RELATED.value or not isinstance(response, dict) or not evidence:
+        return None
+
+    voice = response.get("voice_str") or ""
+    text = response.get("text") or ""
+    answer = "\n".join([voice, text, *(response.get("follow_up_questions") or [])])
+    if not voice or not text:
+        return None
+    if not is_traceable(answer, evidence, GROUNDING_PRECHECK_MIN_COVERAGE):
+        return None
+    if not is_traceable(voice, text, GROUNDING_PRECHECK_MIN_COVERAGE):
+        return None
+    # Search results are joined with blank lines in search_documents; the first part is its header
+    chunks = [chunk for chunk in evidence.split("\n\n")[1:] if chunk.strip()]
+    sentences = split_sentences(f"{voice}\n{text}")
+    if not chunks or not sentences or not await _semantically_grounded(sentences, chunks):
+        return None
+
+    logger.info("Validator LLM skipped: response is lexically and semantically grounded in RAG output")
+    state_value, serialized = _PASSING_VERDICTS[intent]
+    # Same state shape the validator writes via output_key
+    state["temp:validation_result"] = state_value
+    return types.Content(role="model", parts=[types.Part(text=serialized)])
+
+
+async def fill_early_verdict_mode(
+    callback_context: CallbackContext, llm_response: LlmResponse
+) -> Optional[LlmResponse]:
+    """
+    Set validation_mode on a verdict EarlyVerdictGemini completed locally.
+
+    Decoding stops before the model emits validation_mode, so it is taken from
+    the user intent, matching the verdicts synthesized in _PASSING_VERDICTS.
+
+    Args:
+        callback_context: Callback context for the validator agent
+        llm_response: Validator model response
+
+    Returns:
+        None; the response is updated in place
+    """
+    if not (llm_response.custom_metadata or {}).get(EARLY_VERDICT_METADATA_KEY):
+        return None
+    intent = (callback_context.state.get("user_intent") or {}).get("intent")
+    part = llm_response.content.parts[0]
+    result = ValidationResult.model_validate_json(part.text)
+    if intent and result.validation_mode is None:
+        part.text = result.model_copy(update={"validation_mode": intent}).model_dump_json()
+    return None
+
+
 # ============================================================================
 # AGENT 3: VALIDATOR (RESPONSE QUALITY VALIDATION AGENT)
 # ============================================================================
@@ -452,13 +1752,15 @@ avery_agent = LlmAgent(
 # - is_valid: Boolean (final verdict)
 # - traceability_check: Boolean (RAG grounding check)
 # - consistency_check: Boolean (voice/text alignment check)
+# - tool_usage_check / validation_mode: Optional; on an early-stopped pass these
+#   are filled in locally (see llm.passing_validation_json, fill_early_verdict_mode)
 # - feedback: Specific, actionable feedback for retry (empty if valid)
 # - escalate: Boolean flag to control LoopAgent (true=exit, false=retry)
 #
 # SESSION STATE:
 # - INPUT: Reads "avery_response" (concierge output) and "temp:last_rag_output"
-# - OUTPUT: Stores "temp:validation_feedback" for next retry attempt
-# - LOOP CONTROL: Sets escalate=True to exit loop, False to continue retry
+# - OUTPUT: Stores its ValidationResult as "temp:validation_result"
+# - LOOP CONTROL: validation_gate applies the verdict (feedback, retry count, loop exit)
 #
 # INTEGRATION WITH RETRY LOOP:
 # - Runs after avery_agent in each LoopAgent iteration
@@ -468,19 +1770,80 @@ avery_agent = LlmAgent(
 # ============================================================================
 validator_agent = LlmAgent(
     name="validator_agent",
-    model=MODEL_NAME,
+
+    # MODEL: Streams the verdict and stops decoding once is_valid is true
+    # REASON: Passing verdicts (the common case) need no feedback text, so the rest of
+    # ValidationResult is filled in locally instead of generated; failures run to completion
+    model=_gemini(MODEL_NAME, EarlyVerdictGemini),
     description="Response quality validator ensuring compliance with grounding and consistency requirements.",
 
-    # VALIDATOR INSTRUCTIONS: Uses template variables to read response + RAG output from state
+    # VALIDATOR INSTRUCTIONS: Static validation rules first, then a RUNTIME STATE tail that
+    # uses template variables to read response + RAG output from state
     # See prompt.py for detailed validation criteria, examples, and feedback guidelines
-    instruction=VALIDATOR_INSTRUCTIONS,
+    instruction=VALIDATOR_AGENT_INSTRUCTION,
 
     output_schema=ValidationResult,  # Structured validation result with specific feedback
 
+    # OUTPUT KEY: Verdict is read by validation_gate, which updates retry state and exits the loop
+    output_key="temp:validation_result",
+
+    # CALLBACKS: Pass general questions / greetings without an LLM call (no RAG grounding to
+    # check), then pass investment answers that are verifiably grounded by word overlap
+    before_agent_callback=[skip_validation_for_ungrounded_intents, precheck_grounding],
+
     # TEMPERATURE: 0.2 for nuanced validation judgment
     # REASON: Slightly higher than concierge (0.1) to allow flexibility in validation decisions
     # while maintaining consistency
     generate_content_config=types.GenerateContentConfig(temperature=0.2),
+
+    # CALLBACKS: Serve the static prefix from an explicit context cache; afterwards
+    # complete early-stopped verdicts and log cached vs uncached prompt tokens
+    before_model_callback=use_context_cache,
+    after_model_callback=[fill_early_verdict_mode, log_prompt_cache_usage],
+)
+
+# ============================================================================
+# AGENT 4: VALIDATION GATE (LOOP CONTROL)
+# ============================================================================
+# BUSINESS PURPOSE: Turn the validator's verdict into retry state and loop exit
+#
+# WHY A SEPARATE AGENT:
+# - LoopAgent only exits when an event carries actions.escalate, and an LlmAgent
+#   with output_schema cannot set it - so the ValidationResult.escalate field
+#   needs a step that acts on it
+# - Keeps retry bookkeeping deterministic (no LLM involvement)
+#
+# STATE UPDATES (per iteration, from temp:validation_result):
+# - temp:is_valid: validator verdict
+# - temp:validation_feedback: feedback for the concierge's next attempt ("" if valid)
+# - temp:retry_count: incremented on each failed validation
+# - Escalates (exits the loop) when the response is valid
+# ============================================================================
+class ValidationGate(BaseAgent):
+    """Records the validator verdict in temp state and exits the loop when valid."""
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        state = ctx.session.state
+        result = state.get("temp:validation_result") or {}
+        is_valid = bool(result.get("is_valid", False))
+
+        state_delta = {
+            "temp:is_valid": is_valid,
+            "temp:validation_feedback": "" if is_valid else result.get("feedback", ""),
+        }
+        if not is_valid:
+            state_delta["temp:retry_count"] = state.get("temp:retry_count", 0) + 1
+
+        yield Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            actions=EventActions(state_delta=state_delta, escalate=is_valid),
+        )
+
+
+validation_gate = ValidationGate(
+    name="validation_gate",
+    description="Applies the validator verdict: records retry feedback or exits the validation loop.",
 )
 
 # ============================================================================
@@ -497,6 +1860,17 @@ validator_agent = LlmAgent(
 # - Validation fails after max_iterations (3 attempts)
 # - temp:is_valid still False after loop exits
 # ============================================================================
+# Safe fallback message
+# BUSINESS REQUIREMENT: Professional escalation, not technical error
+FALLBACK_RESPONSE = AgentResponse(
+    voice_str="I need to connect you with a specialist for this question.",
+    text="I apologize, but I need to escalate your question to ensure you receive accurate information. A specialist will assist you shortly.",
+    send_to_ui=True,
+    follow_up_questions=(),
+)
+FALLBACK_RESPONSE_JSON = FALLBACK_RESPONSE.model_dump_json()
+
+
 async def handle_validation_failure(callback_context: CallbackContext) -> Optional[types.Content]:
     """
     Handle case where validation fails after max retry attempts.
@@ -526,23 +1900,263 @@ async def handle_validation_failure(callback_context: CallbackContext) -> Option
     # AUDIT REQUIREMENT: Track all validation failures for quality assurance
     validation_feedback = callback_context.state.get("temp:validation_feedback", "Unknown issue")
     logger.error(
-        f"Validation failed after {retry_count} attempts. "
-        f"Last feedback: {validation_feedback}"
+        "Validation failed after %d attempts. Last feedback: %s",
+        retry_count,
+        validation_feedback,
     )
 
-    # Return safe fallback message
-    # BUSINESS REQUIREMENT: Professional escalation, not technical error
-    fallback_response = AgentResponse(
-        voice_str="I need to connect you with a specialist for this question.",
-        text="I apologize, but I need to escalate your question to ensure you receive accurate information. A specialist will assist you shortly.",
-        send_to_ui=True,
-        follow_up_questions=[]
-    )
+    # Return safe fallback message (serialized once at import)
+    # A fresh Content wraps the shared JSON so events never share mutable parts
+    return types.Content(parts=[types.Part(text=FALLBACK_RESPONSE_JSON)])
+
+# ============================================================================
+# CALLBACK: Intent Router (Canned Responses)
+# ============================================================================
+# BUSINESS PURPOSE: Answer greetings and out-of-scope requests without an LLM call
+#
+# WHY:
+# - Greetings and refusals need no RAG and no generation - a fixed, pre-approved
+#   response is correct by construction, so neither the concierge (large prompt +
+#   tool schema) nor the validator needs to run
+# - Out-of-scope / disallowed requests never reach the concierge at all, which
+#   also tightens the safety gate
+#
+# HOW: before_agent_callback on avery_with_validation returns the canned response
+# as Content, which skips the whole concierge/validator loop for this turn.
+# Responses are serialized once at import.
+# ============================================================================
+
+GREETING_RESPONSE = AgentResponse(
+    voice_str="Hello! I'm Avery from JP Morgan's Client Assist platform. I can help you navigate our investment research documents. How may I assist you today?",
+    text="Hi there! I'm Avery, your guide to JP Morgan's investment research and advisory documents. Feel free to ask me about any document-related questions.",
+    send_to_ui=False,
+    follow_up_questions=(),
+)
+
+OUT_OF_SCOPE_RESPONSE = AgentResponse(
+    voice_str="I'm sorry, I can only help with questions about JP Morgan's investment research documents. Is there something there I can help you with?",
+    text="I'm sorry, but that's outside what I can help with. I can answer questions about JP Morgan's investment research and advisory documents, such as market outlooks and investment strategy.",
+    send_to_ui=False,
+    follow_up_questions=(),
+)
+
+# intent -> (state value for avery_response, serialized response)
+_CANNED_RESPONSES = {
+    "greet": (GREETING_RESPONSE.model_dump(), GREETING_RESPONSE.model_dump_json()),
+    "out_of_scope": (OUT_OF_SCOPE_RESPONSE.model_dump(), OUT_OF_SCOPE_RESPONSE.model_dump_json()),
+}
+
+
+async def route_by_intent(callback_context: CallbackContext) -> Optional[types.Content]:
+    """
+    Return a canned response for greetings and disallowed requests.
+
+    Args:
+        callback_context: Callback context with access to session state
+
+    Returns:
+        Canned response Content to skip the concierge loop, None to run it
+    """
+    user_intent = callback_context.state.get("user_intent") or {}
+    intent = user_intent.get("intent")
+    if not user_intent.get("allowed", True):
+        intent = "out_of_scope"
+
+    canned = _CANNED_RESPONSES.get(intent)
+    if canned is None:
+        return None
+
+    state_value, serialized = canned
+    # Keep avery_response populated as if the concierge had answered
+    callback_context.state["avery_response"] = state_value
+    return types.Content(role="model", parts=[types.Part(text=serialized)])
+
+
+# ============================================================================
+# SEMANTIC RESPONSE CACHE
+# ============================================================================
+# BUSINESS PURPOSE: Answer repeated / paraphrased questions without any LLM call
+#
+# HOW IT WORKS:
+# - root_agent before_agent_callback embeds the user message and probes
+#   response_cache (LSH, cosine similarity >= 0.95). Greetings and blocklisted
+#   requests that the intent fast path answers are never embedded
+# - Candidate: the cached answer is re-checked against freshly retrieved evidence
+#   for the new message (reusing the speculative RAG prefetch):
+#   G2 chunk-id Jaccard >= 0.7, G3 shared chunks unchanged, G4 >= 90% of answer
+#   tokens present in the evidence (see cache/grounding.py)
+# - Hit (all gates pass): the cached validated AgentResponse is returned and the
+#   whole pipeline (intent, concierge, validator) is skipped
+# - Miss: the embedding is kept for this invocation; avery_with_validation's
+#   after_agent_callback stores the final response once temp:is_valid is True,
+#   together with the evidence it was grounded on (in the background)
+#
+# COMPLIANCE GUARDS:
+# - Only responses that passed validation are cached (never fallbacks/canned refusals)
+# - Out-of-scope / disallowed turns are never cached
+# - Follow-up style messages ("tell me more about that") depend on conversation
+#   context, so they neither read nor write the cache
+# - Answers whose evidence drifted (re-ranked, edited, removed) are not served
+# - Cleared whenever the knowledge base is re-ingested or reset; 24h TTL
+# ============================================================================
+
+RESPONSE_CACHE_TTL_SECONDS = float(os.environ.get("RESPONSE_CACHE_TTL_SECONDS", str(24 * 3600)))
+response_cache = SemanticCache(
+    threshold=0.95,
+    num_tables=8,
+    hash_bits=16,
+    max_entries=10_000,
+    ttl_seconds=RESPONSE_CACHE_TTL_SECONDS,
+)
+
+# Evidence gates for cache candidates (G2 / G4)
+RESPONSE_CACHE_MIN_EVIDENCE_JACCARD = 0.7
+RESPONSE_CACHE_MIN_ANSWER_COVERAGE = 0.9
+
+# invocation_id -> (user message embedding, speculative RAG task), for write-back after a miss
+_response_cache_keys: Dict[str, Tuple[List[float], Optional[asyncio.Task]]] = {}
+
+# Background cache writes (referenced so they are not garbage-collected mid-flight)
+_response_cache_writes: Set[asyncio.Task] = set()
+
+
+async def _search_evidence(message: str) -> List[dict]:
+    from .rag.retrieval import search_knowledge
+
+    return await search_knowledge(message, limit=RAG_RESULT_LIMIT, search_type="summaries")
+
+
+async def _current_evidence(invocation_id: str, message: str) -> List[dict]:
+    """Evidence for `message` now: this invocation's RAG prefetch, or a fresh search."""
+    entry = _rag_prefetch.get(invocation_id)
+    if entry is not None and entry[0] == message:
+        task = entry[2]
+        try:
+            # Shielded so the prefetch stays usable by search_documents on a miss
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.cancelled():
+                raise
+    return await _search_evidence(message)
+
+
+async def _store_validated_response(
+    embedding: List[float],
+    prefetch: Optional[asyncio.Task],
+    message: str,
+    response: AgentResponse,
+) -> None:
+    if prefetch is not None and prefetch.done() and not prefetch.cancelled() and prefetch.exception() is None:
+        evidence = prefetch.result()
+    else:
+        evidence = await _search_evidence(message)
+
+    if not evidence:
+        # Nothing to re-validate a future hit against - don't cache
+        return
+
+    response_cache.put(embedding, {
+        "message": message,
+        "response": response.model_dump_json(),
+        "state": response.model_dump(),
+        "evidence": evidence_versions(evidence, _result_text),
+        "answer_tokens": frozenset(tokenize(f"{response.voice_str} {response.text}")),
+    })
+
+
+async def serve_cached_response(callback_context: CallbackContext) -> Optional[types.Content]:
+    """
+    Return a previously validated response for a semantically equivalent message.
+
+    Args:
+        callback_context: Callback context for the root agent invocation
+
+    Returns:
+        Cached response Content to skip the pipeline, None on a miss
+    """
+    if RESPONSE_CACHE_TTL_SECONDS <= 0:
+        return None
+
+    message = _user_message_text(callback_context)
+    if not message or _CONTEXT_DEPENDENT_PATTERN.search(message) or _answered_by_fast_path(message):
+        return None
+
+    embedding = await _embed_message(callback_context)
+    if embedding is None:
+        return None
+
+    invocation_id = callback_context.invocation_id
+    cached = response_cache.get(embedding)
+    if cached is not None:
+        evidence = await _current_evidence(invocation_id, message)
+        if not is_grounded_hit(
+            cached["evidence"],
+            cached["answer_tokens"],
+            evidence,
+            _result_text,
+            min_jaccard=RESPONSE_CACHE_MIN_EVIDENCE_JACCARD,
+            min_coverage=RESPONSE_CACHE_MIN_ANSWER_COVERAGE,
+        ):
+            logger.info("Response cache candidate for %r rejected: evidence changed", message)
+            cached = None
+
+    if cached is None:
+        prefetch = _rag_prefetch.get(invocation_id)
+        _response_cache_keys[invocation_id] = (embedding, prefetch[2] if prefetch else None)
+        return None
+
+    logger.info("Response cache hit for %r (cached message %r)", message, cached["message"])
+
+    # Root after_agent_callback does not run for a skipped agent
+    _cancel_rag_prefetch(callback_context.invocation_id)
+    _message_embeddings.pop(callback_context.invocation_id, None)
+
+    callback_context.state["avery_response"] = cached["state"]
+    return types.Content(role="model", parts=[types.Part(text=cached["response"])])
+
+
+async def cache_validated_response(callback_context: CallbackContext) -> None:
+    """
+    Store the validated response for this invocation's message in response_cache.
+
+    Args:
+        callback_context: Callback context for avery_with_validation
+    """
+    pending = _response_cache_keys.pop(callback_context.invocation_id, None)
+    if pending is None or not callback_context.state.get("temp:is_valid", False):
+        return None
+
+    user_intent = callback_context.state.get("user_intent") or {}
+    if not user_intent.get("allowed", True) or user_intent.get("intent") == "out_of_scope":
+        return None
+
+    avery_response = callback_context.state.get("avery_response")
+    if not avery_response:
+        return None
+
+    # Evidence lookup may need a search - keep it off the response path
+    embedding, prefetch = pending
+    task = asyncio.create_task(_store_validated_response(
+        embedding,
+        prefetch,
+        _user_message_text(callback_context),
+        AgentResponse.model_validate(avery_response),
+    ))
+    _response_cache_writes.add(task)
+    task.add_done_callback(_response_cache_writes.discard)
+    return None
+
+
+async def discard_response_cache_key(callback_context: CallbackContext) -> None:
+    """
+    Drop this invocation's pending response-cache key if it was not written back.
+
+    Args:
+        callback_context: Callback context for the root agent invocation
+    """
+    _response_cache_keys.pop(callback_context.invocation_id, None)
+    return None
 
-    # Return as Content for ADK framework
-    return types.Content(parts=[
-        types.Part(text=fallback_response.model_dump_json())
-    ])
 
 # ============================================================================
 # LOOP AGENT: CONCIERGE WITH VALIDATION RETRY
@@ -563,27 +2177,34 @@ async def handle_validation_failure(callback_context: CallbackContext) -> Option
 # 2. validator_agent executes:
 #    - Reads avery_response and temp:last_rag_output from state
 #    - Validates traceability + consistency
-#    - If invalid: Stores temp:validation_feedback, returns escalate=False → loop continues
-#    - If valid: Returns escalate=True → loop exits
+#    - Stores its ValidationResult as temp:validation_result
 #
-# 3. If max_iterations reached without valid response:
+# 3. validation_gate executes:
+#    - If invalid: Stores temp:validation_feedback, increments temp:retry_count → loop continues
+#    - If valid: Sets temp:is_valid, escalates → loop exits
+#
+# 4. If max_iterations reached without valid response:
 #    - handle_validation_failure callback triggers
 #    - Returns safe escalation message
 #
 # EXIT CONDITIONS:
-# - Success: validator_agent returns escalate=True
+# - Success: validation_gate escalates (validator returned is_valid=True)
 # - Max Retries: Reached 3 iterations → fallback handler
 # ============================================================================
 avery_with_validation = LoopAgent(
     name="avery_with_validation",
-    sub_agents=[avery_agent, validator_agent],
+    sub_agents=[avery_agent, validator_agent, validation_gate],
     max_iterations=3,  # Maximum retry attempts before fallback
     # Note: avery_agent already saves its output to "avery_response" via its output_key
 )
 
 # Attach fallback handler for max retries scenario
-# COMPLIANCE: Ensures professional escalation on persistent validation failure
-avery_with_validation.after_agent_callback = handle_validation_failure
+# COMPLIANCE: Ensures professional escalation on persistent validation failure;
+# otherwise a validated response is written to the semantic response cache
+avery_with_validation.after_agent_callback = [handle_validation_failure, cache_validated_response]
+
+# Answer greetings / out-of-scope requests directly, skipping the loop
+avery_with_validation.before_agent_callback = route_by_intent
 
 # ============================================================================
 # ROOT AGENT: SEQUENTIAL ORCHESTRATOR
@@ -607,6 +2228,7 @@ avery_with_validation.after_agent_callback = handle_validation_failure
 #    c. If invalid: Loop continues with feedback
 #    d. If valid: Loop exits
 #    e. If max retries: Fallback handler returns escalation message
+#    (greet / out_of_scope intents: canned response, loop skipped - see route_by_intent)
 #
 # BUSINESS CONSTRAINTS:
 # 1. UNIFIED SYSTEM APPEARANCE (CRITICAL):
@@ -652,8 +2274,17 @@ root_agent = SequentialAgent(
     # Sequential execution order: intent_agent → avery_with_validation (LoopAgent)
     # BUSINESS REQUIREMENT: Intent classification, then validated response generation
     sub_agents=[intent_agent, avery_with_validation],
+
+    # CALLBACKS: Start RAG retrieval in parallel with intent classification, then
+    # serve repeated questions from the response cache (skipping the pipeline);
+    # clean up any unconsumed speculative search / cache key / message embedding when the turn ends
+    before_agent_callback=[start_rag_prefetch, serve_cached_response],
+    after_agent_callback=[discard_rag_prefetch, discard_response_cache_key, discard_message_embedding],
 )
 
+# Warm RAG immediately when loaded inside a running event loop (adk web / api_server)
+_ensure_rag_warmup()
+
 # ============================================================================
 # MODULE EXPORTS
 # ============================================================================
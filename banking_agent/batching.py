@@ -0,0 +1,113 @@
+"""
+Request Batch Coalescing
+
+This module merges concurrent single-item calls to a batch-capable backend
+into one batched call. Items submitted within a short window (or until the
+batch is full) are sent together and each caller receives its own result.
+
+At low traffic a coalescing window would only add latency, so when the recent
+request rate is below `min_qps` items are passed straight through as
+single-item batches.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Generic, List, Optional, Set, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class BatchCoalescer(Generic[T, R]):
+    """
+    Coalesces concurrent submit() calls into batched calls of `batch_fn`.
+
+    `batch_fn` receives a list of items and must return one result per item,
+    in the same order. If it raises, or returns the wrong number of results,
+    every caller in that batch receives the exception; if the batch is
+    cancelled, so are the callers' futures. No caller is ever left waiting.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[T]], Awaitable[List[R]]],
+        max_batch_size: int = 16,
+        window_seconds: float = 0.03,
+        min_qps: float = 1.0,
+    ):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.window_seconds = window_seconds
+        self.min_qps = min_qps
+        self._pending: List[Tuple[T, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._arrivals: Deque[float] = deque()
+        self._running: Set[asyncio.Task] = set()
+
+    async def submit(self, item: T) -> R:
+        """
+        Submit one item and wait for its result.
+
+        Args:
+            item: Item to process
+
+        Returns:
+            The result for `item`
+        """
+        if self._recent_qps() < self.min_qps and not self._pending:
+            results = await self.batch_fn([item])
+            _check_result_count(results, 1)
+            return results[0]
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window_seconds, self._flush)
+
+        return await future
+
+    def _recent_qps(self) -> float:
+        now = time.monotonic()
+        self._arrivals.append(now)
+        while self._arrivals and now - self._arrivals[0] > 1.0:
+            self._arrivals.popleft()
+        return len(self._arrivals) - 1
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: List[Tuple[T, asyncio.Future]]) -> None:
+        futures = [future for _, future in batch]
+        try:
+            results = await self.batch_fn([item for item, _ in batch])
+            _check_result_count(results, len(batch))
+            for future, result in zip(futures, results):
+                if not future.done():
+                    future.set_result(result)
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            # Cancellation (or anything else escaping above) must not leave callers waiting
+            for future in futures:
+                if not future.done():
+                    future.cancel()
+
+
+def _check_result_count(results: List[R], expected: int) -> None:
+    if len(results) != expected:
+        raise ValueError(f"batch_fn returned {len(results)} results for {expected} items")
@@ -0,0 +1,5 @@
+# Caching utilities for banking_agent
+from .lsh import LSHIndex
+from .semantic import SemanticCache
+
+__all__ = ["LSHIndex", "SemanticCache"]
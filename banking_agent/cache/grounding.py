@@ -0,0 +1,202 @@
+"""
+Evidence-Validated Cache Gating
+
+This module decides whether a cached answer is still supported by the
+knowledge base before it is served again. Embedding similarity alone says the
+question is the same; it says nothing about whether the documents behind the
+answer have changed since it was cached.
+
+A cached answer is served only if all gates pass against freshly retrieved
+evidence for the new query:
+
+- G1 query similarity: handled by SemanticCache's threshold
+- G2 evidence overlap: Jaccard similarity of retrieved chunk ids
+- G3 evidence versions: every shared chunk has the same content hash
+- G4 answer coverage: most answer tokens appear in the new evidence text
+
+is_traceable() is a stricter, claim-level variant of the coverage test: each
+clause of an answer must be covered by a single clause of the evidence, so
+facts cannot be stitched together from different evidence sentences. The
+validator runs it before falling back to its LLM judgement.
+"""
+
+import hashlib
+import re
+from typing import Any, Callable, Dict, Iterable, List, Set
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+_SENTENCE_PATTERN = re.compile(r"(?<=[.!?])\s+|\n+")
+# Sentence breaks plus clause separators, so "A grew 35% and B grew 22%" is two claims
+_CLAUSE_PATTERN = re.compile(r"(?<=[.!?])\s+|\n+|[,;:]\s+|\s+(?:and|but|while|whereas)\s+", re.IGNORECASE)
+_NUMBER_PATTERN = re.compile(r"\d")
+_CAPITALIZED_PATTERN = re.compile(r"\b[A-Z][A-Za-z0-9]*")
+_NEGATION_PATTERN = re.compile(r"\b(?:no|not|never|without|none|nor|cannot)\b|n['\u2019]t\b")
+
+# Function words carry no claim, so they are ignored by is_traceable(). Negations
+# are deliberately absent: dropping "not" would let a sentence pass against
+# evidence that says the opposite.
+STOPWORDS = frozenset(
+    "a an and are as at be been but by can could do does for from has have how i if in into is it its "
+    "me more most my of on or our so such than that the their them there these they this those "
+    "to was we were what when where which while who will with would you your".split()
+)
+
+
+def _content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+
+def tokenize(text: str) -> Set[str]:
+    """Return the set of lowercased alphanumeric tokens in `text`."""
+    return set(_TOKEN_PATTERN.findall(text.lower()))
+
+
+def evidence_versions(results: Iterable[Any], text_of: Callable[[Any], str]) -> Dict[str, str]:
+    """
+    Map each retrieved chunk to a content version.
+
+    Chunks are identified by their `id` when the result carries one, otherwise
+    by content hash (in which case G3 is implied by G2).
+
+    Args:
+        results: Search results
+        text_of: Function returning a result's text
+
+    Returns:
+        Dict of chunk id -> content hash
+    """
+    versions = {}
+    for result in results:
+        text = text_of(result)
+        version = _content_hash(text)
+        chunk_id = result.get("id") if isinstance(result, dict) else None
+        versions[str(chunk_id) if chunk_id is not None else version] = version
+    return versions
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split `text` into non-empty sentences (and lines)."""
+    return [sentence.strip() for sentence in _SENTENCE_PATTERN.split(text) if sentence.strip()]
+
+
+def _negations(text: str) -> Set[str]:
+    """Return the negation words in `text`, with n't and cannot normalized to "not"."""
+    return {
+        "not" if word in ("cannot", "n't", "n\u2019t") else word
+        for word in _NEGATION_PATTERN.findall(text.lower())
+    }
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    """Jaccard similarity of two sets (1.0 when both are empty)."""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def token_coverage(answer_tokens: Set[str], evidence_tokens: Set[str]) -> float:
+    """Fraction of answer tokens that appear in the evidence (1.0 for an empty answer)."""
+    if not answer_tokens:
+        return 1.0
+    return len(answer_tokens & evidence_tokens) / len(answer_tokens)
+
+
+def is_grounded_hit(
+    cached_versions: Dict[str, str],
+    answer_tokens: Set[str],
+    results: Iterable[Any],
+    text_of: Callable[[Any], str],
+    min_jaccard: float = 0.7,
+    min_coverage: float = 0.9,
+) -> bool:
+    """
+    Check gates G2-G4 for a cache candidate against freshly retrieved evidence.
+
+    Args:
+        cached_versions: evidence_versions() recorded when the answer was cached
+        answer_tokens: tokenize() of the cached answer text
+        results: Fresh search results for the new query
+        text_of: Function returning a result's text
+        min_jaccard: G2 threshold on chunk-id overlap
+        min_coverage: G4 threshold on answer-token coverage
+
+    Returns:
+        True if the cached answer may be served
+    """
+    results = list(results)
+    if not results or not cached_versions:
+        return False
+
+    current_versions = evidence_versions(results, text_of)
+
+    # G2: substantially the same evidence is retrieved
+    if jaccard(set(cached_versions), set(current_versions)) < min_jaccard:
+        return False
+
+    # G3: shared evidence has not been edited since caching
+    for chunk_id in cached_versions.keys() & current_versions.keys():
+        if cached_versions[chunk_id] != current_versions[chunk_id]:
+            return False
+
+    # G4: the cached answer is still supported by the evidence text
+    evidence_tokens: Set[str] = set()
+    for result in results:
+        evidence_tokens |= tokenize(text_of(result))
+    return token_coverage(answer_tokens, evidence_tokens) >= min_coverage
+
+
+def is_traceable(
+    answer_text: str,
+    evidence_text: str,
+    min_coverage: float = 0.8,
+    min_tokens: int = 3,
+) -> bool:
+    """
+    Check that every claim in `answer_text` is lexically grounded in a single evidence clause.
+
+    Both texts are split into clauses (sentences, further split at commas,
+    semicolons, colons and and/but/while/whereas). An answer clause passes if
+    some ONE evidence clause contains every token of it with a digit (figures,
+    dates, percentages, rankings), every capitalized word (countries, companies,
+    sectors), every negation it uses (no, not, n't, never, without, ...), and at
+    least `min_coverage` of its content words (tokens minus STOPWORDS).
+    Matching per clause rather than against the whole evidence means swapped
+    facts - "Sweden ranks 1st" against "Switzerland ranks 1st ... Sweden ranks
+    2nd" - fail. Clauses with no figure or negation and fewer than `min_tokens`
+    content words (headings, "Key points:") are skipped.
+
+    This only ever confirms grounding: paraphrases fail it, so callers should
+    treat False as "undecided", not as a fabrication.
+
+    Args:
+        answer_text: Response text to check
+        evidence_text: Retrieved evidence the response must be grounded in
+        min_coverage: Per-clause content-word coverage threshold
+        min_tokens: Minimum content words for a clause without figures to be checked
+
+    Returns:
+        True if every checked clause is grounded
+    """
+    evidence_clauses = [
+        (tokens, _negations(clause))
+        for clause in _CLAUSE_PATTERN.split(evidence_text)
+        if (tokens := tokenize(clause))
+    ]
+    if not evidence_clauses:
+        return False
+
+    for clause in _CLAUSE_PATTERN.split(answer_text):
+        tokens = tokenize(clause) - STOPWORDS
+        figures = {token for token in tokens if _NUMBER_PATTERN.search(token)}
+        negations = _negations(clause)
+        if not figures and not negations and len(tokens) < min_tokens:
+            continue
+        required = figures | (tokenize(" ".join(_CAPITALIZED_PATTERN.findall(clause))) - STOPWORDS)
+        if not any(
+            required <= evidence_tokens
+            and negations <= evidence_negations
+            and token_coverage(tokens, evidence_tokens) >= min_coverage
+            for evidence_tokens, evidence_negations in evidence_clauses
+        ):
+            return False
+    return True
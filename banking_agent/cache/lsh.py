@@ -0,0 +1,107 @@
+"""
+Random-Projection LSH Index
+
+This module provides a locality-sensitive hash index over unit vectors for
+approximate nearest-neighbour candidate lookup under cosine similarity.
+
+Each of N_TABLES tables hashes a vector to an N_BITS signature: bit i is the
+sign of the vector's projection onto random Gaussian hyperplane i, packed into
+an integer. Vectors with a small angle between them agree on most bits, so
+near neighbours share a bucket in at least one table with high probability.
+Lookups probe one bucket per table - O(N_TABLES) regardless of index size -
+and callers rank the returned candidates with an exact similarity check.
+"""
+
+from typing import Dict, Hashable, Iterable, Optional, Set, Tuple
+
+import numpy as np
+
+N_TABLES = 8
+N_BITS = 16
+
+
+class LSHIndex:
+    """
+    Maps entry ids to LSH buckets across several hash tables.
+
+    Projection matrices are drawn once, from `seed`, when the vector dimension
+    is first seen (on the first add) and are frozen afterwards.
+    """
+
+    def __init__(self, num_tables: int = N_TABLES, num_bits: int = N_BITS, seed: int = 0):
+        if num_bits > 64:
+            raise ValueError("num_bits must be <= 64 to pack signatures into uint64")
+        self.num_tables = num_tables
+        self.num_bits = num_bits
+        self._rng = np.random.default_rng(seed)
+        self._projections: Optional[np.ndarray] = None  # (dim, num_tables * num_bits)
+        self._bit_weights = np.uint64(1) << np.arange(num_bits, dtype=np.uint64)
+        self._tables: Tuple[Dict[int, Set[Hashable]], ...] = tuple({} for _ in range(num_tables))
+
+    def signatures(self, vector: np.ndarray) -> Tuple[int, ...]:
+        """
+        Compute one packed signature per table for `vector`.
+
+        Args:
+            vector: 1-D embedding (need not be normalized - only signs are used)
+
+        Returns:
+            Tuple of num_tables integer signatures
+        """
+        if self._projections is None:
+            self._projections = self._rng.standard_normal((vector.shape[0], self.num_tables * self.num_bits))
+        bits = (vector @ self._projections > 0).reshape(self.num_tables, self.num_bits)
+        return tuple(int(code) for code in bits.astype(np.uint64) @ self._bit_weights)
+
+    def add(self, entry_id: Hashable, vector: np.ndarray) -> Tuple[int, ...]:
+        """
+        Insert `entry_id` into its bucket in every table.
+
+        Args:
+            entry_id: Caller-side identifier for the vector
+            vector: 1-D embedding
+
+        Returns:
+            The entry's signatures (pass them to remove())
+        """
+        signatures = self.signatures(vector)
+        for table, signature in zip(self._tables, signatures):
+            table.setdefault(signature, set()).add(entry_id)
+        return signatures
+
+    def remove(self, entry_id: Hashable, signatures: Iterable[int]) -> None:
+        """
+        Remove `entry_id` from the buckets given by `signatures`.
+
+        Args:
+            entry_id: Identifier passed to add()
+            signatures: Signatures returned by add()
+        """
+        for table, signature in zip(self._tables, signatures):
+            bucket = table.get(signature)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del table[signature]
+
+    def candidates(self, vector: np.ndarray) -> Set[Hashable]:
+        """
+        Return ids sharing a bucket with `vector` in any table.
+
+        Args:
+            vector: 1-D query embedding
+
+        Returns:
+            Union of matching bucket contents (empty before the first add)
+        """
+        if self._projections is None:
+            return set()
+        found: Set[Hashable] = set()
+        for table, signature in zip(self._tables, self.signatures(vector)):
+            found.update(table.get(signature, ()))
+        return found
+
+    def clear(self) -> None:
+        """Empty all tables (projections are kept)."""
+        for table in self._tables:
+            table.clear()
@@ -0,0 +1,188 @@
+"""
+Semantic Cache using Locality-Sensitive Hashing
+
+This module provides an in-memory cache keyed by query embeddings rather than
+query strings, so paraphrased questions ("top innovation countries 2024" vs
+"which countries lead innovation") can be served from a previous answer.
+
+Candidate lookup uses the random-projection LSH index in lsh.py, so a lookup
+probes a fixed number of buckets instead of scanning every cached embedding.
+A candidate is a hit only if its cosine similarity with the query is at least
+`threshold`.
+
+Cached embeddings are stored as int8 codes with one float scale per vector
+(x ~= codes * scale), a quarter of the float32 size. Candidates are scored
+asymmetrically - the float32 query against the dequantized codes - which keeps
+the similarity error around 1e-3 for unit vectors, well inside the gap between
+a paraphrase and a different question.
+
+Once the cache is full, eviction favours popular regions of query space over
+the long tail of one-off questions: among the `eviction_sample` least recently
+used entries, the one with the lowest priority is dropped, where
+
+    priority = hits + hub_weight * neighbours
+
+`hits` counts times the entry was served and `neighbours` counts other cached
+entries within `hub_threshold` cosine of it (a hub sits where many distinct
+phrasings of a question land). Sampling from the LRU end keeps eviction O(1)
+in the cache size; stale popular entries still age out through the TTL.
+"""
+
+import time
+from collections import OrderedDict
+from itertools import islice
+from typing import Any, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .lsh import N_BITS, N_TABLES, LSHIndex
+
+
+class _Entry:
+    __slots__ = ("codes", "scale", "value", "expires_at", "signatures", "hits", "neighbours")
+
+    def __init__(self, codes: np.ndarray, scale: float, value: Any, expires_at: float):
+        self.codes = codes
+        self.scale = scale
+        self.value = value
+        self.expires_at = expires_at
+        self.signatures: Tuple[int, ...] = ()
+        self.hits = 0
+        self.neighbours = 0
+
+    def similarity(self, vector: np.ndarray) -> float:
+        """Approximate cosine similarity with a unit float32 `vector`."""
+        return float(np.dot(self.codes.astype(np.float32), vector)) * self.scale
+
+
+class SemanticCache:
+    """
+    TTL cache of values keyed by embedding similarity.
+
+    Entries expire after `ttl_seconds`. Once `max_entries` is reached, the
+    lowest-priority entry among the `eviction_sample` least recently used is
+    evicted (see module docstring).
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.95,
+        num_tables: int = N_TABLES,
+        hash_bits: int = N_BITS,
+        max_entries: int = 10_000,
+        ttl_seconds: float = 3600,
+        seed: int = 0,
+        eviction_sample: int = 16,
+        hub_threshold: float = 0.9,
+        hub_weight: float = 0.5,
+    ):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.eviction_sample = eviction_sample
+        self.hub_threshold = hub_threshold
+        self.hub_weight = hub_weight
+        self._index = LSHIndex(num_tables=num_tables, num_bits=hash_bits, seed=seed)
+
+        # entry id -> entry, least recently used first
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, embedding: Sequence[float]) -> Optional[Any]:
+        """
+        Return the cached value most similar to `embedding`, if above threshold.
+
+        Args:
+            embedding: Query embedding
+
+        Returns:
+            The cached value, or None on a miss
+        """
+        vector = self._normalize(embedding)
+
+        now = time.monotonic()
+        best_id, best_score = None, self.threshold
+        for entry_id in self._index.candidates(vector):
+            entry = self._entries[entry_id]
+            if entry.expires_at <= now:
+                self._remove(entry_id)
+                continue
+            score = entry.similarity(vector)
+            if score >= best_score:
+                best_id, best_score = entry_id, score
+
+        if best_id is None:
+            return None
+        self._entries.move_to_end(best_id)
+        entry = self._entries[best_id]
+        entry.hits += 1
+        return entry.value
+
+    def put(self, embedding: Sequence[float], value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """
+        Store `value` under `embedding`.
+
+        Args:
+            embedding: Query embedding
+            value: Value to return for similar queries
+            ttl_seconds: Override the cache-wide TTL for this entry
+        """
+        vector = self._normalize(embedding)
+
+        while len(self._entries) >= self.max_entries:
+            self._evict()
+
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        codes, scale = self._quantize(vector)
+        entry = _Entry(codes, scale, value, time.monotonic() + ttl)
+
+        # Neighbour counts are maintained on insert only; removals leave them
+        # slightly high, which just delays evicting entries near a removed one
+        for neighbour_id in self._index.candidates(vector):
+            neighbour = self._entries[neighbour_id]
+            if neighbour.similarity(vector) >= self.hub_threshold:
+                neighbour.neighbours += 1
+                entry.neighbours += 1
+
+        entry_id = self._next_id
+        self._next_id += 1
+        entry.signatures = self._index.add(entry_id, vector)
+        self._entries[entry_id] = entry
+
+    def clear(self) -> None:
+        """Drop all entries (e.g. after the underlying knowledge base changes)."""
+        self._entries.clear()
+        self._index.clear()
+
+    def _evict(self) -> None:
+        """Remove the lowest-priority entry among the least recently used sample."""
+        now = time.monotonic()
+        victim_id, victim_priority = None, float("inf")
+        for entry_id, entry in islice(self._entries.items(), self.eviction_sample):
+            if entry.expires_at <= now:
+                victim_id = entry_id
+                break
+            priority = entry.hits + self.hub_weight * entry.neighbours
+            if priority < victim_priority:
+                victim_id, victim_priority = entry_id, priority
+        self._remove(victim_id)
+
+    def _remove(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id)
+        self._index.remove(entry_id, entry.signatures)
+
+    @staticmethod
+    def _quantize(vector: np.ndarray) -> Tuple[np.ndarray, float]:
+        """Symmetric int8 quantization with a per-vector scale."""
+        peak = float(np.max(np.abs(vector))) if vector.size else 0.0
+        scale = peak / 127 if peak else 1.0
+        return np.round(vector / scale).astype(np.int8), scale
+
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
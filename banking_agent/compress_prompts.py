@@ -0,0 +1,68 @@
+"""
+Offline Prompt Compression
+
+This module compresses the concierge's static instructions with LLMLingua-2
+and writes the result to prompt_compressed.py. The concierge instructions are
+sent on every concierge call, so a shorter prompt directly cuts prefill time
+and input tokens.
+
+The compressed prompt is only used when USE_COMPRESSED_PROMPTS=true. Before
+enabling it, run the eval set with both variants and keep the original if
+response-schema validity or eval scores drop:
+
+    pip install llmlingua
+    python -m banking_agent.compress_prompts --rate 0.33
+    USE_COMPRESSED_PROMPTS=true adk eval banking_agent banking_agent/test_suite.evalset.json
+
+Field names of the response schema and markdown structure are kept verbatim
+so the compressed prompt still describes the same output format.
+"""
+
+import argparse
+from pathlib import Path
+
+from .prompt import CONCIERGE_INSTRUCTIONS_SOURCE
+
+DEFAULT_MODEL = "microsoft/llmlingua-2-xlm-roberta-large-meetingbank"
+OUTPUT_PATH = Path(__file__).with_name("prompt_compressed.py")
+
+# Tokens LLMLingua must never drop
+FORCE_TOKENS = ["\n", "#", "-", ":", "voice_str", "text", "send_to_ui", "follow_up_questions", "search_documents"]
+
+
+def compress(prompt: str, rate: float, model_name: str = DEFAULT_MODEL) -> str:
+    """
+    Compress `prompt` to roughly `rate` of its tokens.
+
+    Args:
+        prompt: Prompt text
+        rate: Target fraction of tokens to keep
+        model_name: LLMLingua-2 model
+
+    Returns:
+        Compressed prompt text
+    """
+    from llmlingua import PromptCompressor
+
+    compressor = PromptCompressor(model_name=model_name, use_llmlingua2=True)
+    result = compressor.compress_prompt(prompt, rate=rate, force_tokens=FORCE_TOKENS, drop_consecutive=True)
+    return result["compressed_prompt"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compress the concierge instructions with LLMLingua-2.")
+    parser.add_argument("--rate", type=float, default=0.33, help="Target fraction of tokens to keep")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="LLMLingua-2 model name")
+    args = parser.parse_args()
+
+    compressed = compress(CONCIERGE_INSTRUCTIONS_SOURCE, args.rate, args.model)
+    OUTPUT_PATH.write_text(
+        "# Generated by compress_prompts.py - do not edit by hand\n"
+        f"# Source: CONCIERGE_INSTRUCTIONS, rate={args.rate}, model={args.model}\n\n"
+        f"CONCIERGE_INSTRUCTIONS_COMPRESSED = {compressed!r}\n"
+    )
+    print(f"Wrote {OUTPUT_PATH} ({len(CONCIERGE_INSTRUCTIONS_SOURCE)} -> {len(compressed)} characters)")
+
+
+if __name__ == "__main__":
+    main()
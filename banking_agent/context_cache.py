@@ -0,0 +1,171 @@
+"""
+Explicit Gemini Context Caching
+
+This module moves the static part of an agent's system instruction (plus its
+tool declarations) into a Gemini `cachedContents` resource and points each
+request at it via `cached_content`, so the provider skips prefill for the
+cached prefix and bills those tokens at the cached rate.
+
+The static part is everything before RUNTIME_STATE_DELIMITER (see prompt.py).
+The per-turn runtime tail cannot live in the cache, and Gemini rejects
+requests that set `system_instruction` together with `cached_content`, so the
+tail is sent as a leading user message instead.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Dict, Optional, Tuple
+
+from google import genai
+from google.adk.models import Gemini
+from google.genai import errors, types
+
+from .llm import shared_client
+from .prompt import RUNTIME_STATE_DELIMITER
+
+logger = logging.getLogger(__name__)
+
+
+class ExplicitContextCache:
+    """
+    Creates and refreshes Gemini context caches keyed by (model, static prompt, tools).
+
+    Caches are created lazily on the first request that needs them and
+    re-created in the background once they are within `refresh_margin_seconds`
+    of expiring. If a cache cannot be created (e.g. the prompt is below the
+    model's minimum cacheable size), the key is remembered and requests are
+    sent unchanged, falling back to implicit caching.
+
+    Cache calls go through the agents' shared client (see llm.shared_client),
+    configured like `model`, so they reuse the same connection pool.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int = 3600,
+        refresh_margin_seconds: int = 300,
+        model: Optional[Gemini] = None,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self.model = model
+        self._entries: Dict[str, Tuple[str, float]] = {}  # key -> (cache name, expires_at)
+        self._unsupported: set = set()
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self._lock = asyncio.Lock()
+
+    @property
+    def client(self) -> genai.Client:
+        retry_options = self.model.retry_options if self.model is not None else None
+        return shared_client(retry_options, model=self.model)
+
+    async def apply(self, llm_request) -> None:
+        """
+        Rewrite `llm_request` in place to use an explicit cache for its static prefix.
+
+        Args:
+            llm_request: ADK LlmRequest about to be sent to Gemini
+        """
+        config = llm_request.config
+        if not isinstance(config.system_instruction, str) or config.cached_content:
+            return
+
+        static_prompt, _, runtime_state = config.system_instruction.partition(RUNTIME_STATE_DELIMITER)
+        key = self._cache_key(llm_request.model, static_prompt, config)
+        if key in self._unsupported:
+            return
+
+        cache_name = await self._get_or_create(key, llm_request.model, static_prompt, config)
+        if cache_name is None:
+            return
+
+        config.cached_content = cache_name
+        config.system_instruction = None
+        config.tools = None
+        config.tool_config = None
+        if runtime_state:
+            llm_request.contents.insert(0, types.Content(
+                role="user",
+                parts=[types.Part(text=f"RUNTIME STATE:\n{runtime_state}")],
+            ))
+
+    @staticmethod
+    def _cache_key(model: str, static_prompt: str, config: types.GenerateContentConfig) -> str:
+        digest = hashlib.sha256()
+        digest.update((model or "").encode())
+        digest.update(static_prompt.encode())
+        for tool in config.tools or []:
+            if isinstance(tool, types.Tool):
+                digest.update(tool.model_dump_json(exclude_none=True).encode())
+        return digest.hexdigest()
+
+    async def _get_or_create(
+        self,
+        key: str,
+        model: str,
+        static_prompt: str,
+        config: types.GenerateContentConfig,
+    ) -> Optional[str]:
+        entry = self._entries.get(key)
+        now = time.monotonic()
+
+        if entry and entry[1] > now:
+            # Still valid - refresh in the background when close to expiry
+            if entry[1] - now < self.refresh_margin_seconds and key not in self._refreshing:
+                self._refreshing[key] = asyncio.create_task(
+                    self._refresh(key, model, static_prompt, config)
+                )
+            return entry[0]
+
+        async with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[1] > time.monotonic():
+                return entry[0]
+            if key in self._unsupported:
+                return None
+            return await self._create(key, model, static_prompt, config)
+
+    async def _refresh(
+        self,
+        key: str,
+        model: str,
+        static_prompt: str,
+        config: types.GenerateContentConfig,
+    ) -> None:
+        try:
+            await self._create(key, model, static_prompt, config)
+        finally:
+            self._refreshing.pop(key, None)
+
+    async def _create(
+        self,
+        key: str,
+        model: str,
+        static_prompt: str,
+        config: types.GenerateContentConfig,
+    ) -> Optional[str]:
+        try:
+            cache = await self.client.aio.caches.create(
+                model=model,
+                config=types.CreateCachedContentConfig(
+                    system_instruction=static_prompt,
+                    tools=config.tools,
+                    tool_config=config.tool_config,
+                    ttl=f"{self.ttl_seconds}s",
+                    display_name=f"banking-agent-{key[:12]}",
+                ),
+            )
+        except errors.ClientError as e:
+            # Rejected by the API (e.g. prompt below the minimum cacheable size) - don't retry
+            logger.warning("Context cache not supported for %s, using implicit caching: %s", model, e)
+            self._unsupported.add(key)
+            return None
+        except Exception as e:
+            logger.warning("Context cache creation failed for %s, will retry: %s", model, e)
+            return None
+
+        self._entries[key] = (cache.name, time.monotonic() + self.ttl_seconds)
+        logger.info("Created context cache %s for %s", cache.name, model)
+        return cache.name
@@ -0,0 +1,104 @@
+"""
+Local Intent Classifier
+
+This module serves the four-way intent label from a small fine-tuned sequence
+classifier (e.g. distilbert-base-uncased) exported to ONNX and quantized to
+INT8, instead of a Gemini call. Inference takes a few milliseconds on CPU.
+
+The classifier is optional and only loaded when INTENT_CLASSIFIER_MODEL_DIR
+points at an exported model. Its `id2label` must use the IntentCategory values
+(greet, investment_related_question, general_question, out_of_scope). Export
+and quantize a fine-tuned checkpoint with:
+
+    pip install -r banking_agent/rag/requirements-optional.txt
+    optimum-cli export onnx --model <fine-tuned checkpoint> --task text-classification <dir>
+    optimum-cli onnxruntime quantize --onnx_model <dir> --avx512_vnni -o <dir>-int8
+
+Predictions below `min_confidence` are discarded so the message falls back to
+the LLM classifier. Before enabling, compare the classifier's labels with the
+LLM's on the eval set; out_of_scope is a compliance gate, not just a route.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .models import IntentCategory, IntentGuardrailOutput
+
+logger = logging.getLogger(__name__)
+
+INTENT_CLASSIFIER_MODEL_DIR = os.environ.get("INTENT_CLASSIFIER_MODEL_DIR", "")
+INTENT_CLASSIFIER_MIN_CONFIDENCE = float(os.environ.get("INTENT_CLASSIFIER_MIN_CONFIDENCE", "0.6"))
+
+
+class LocalIntentClassifier:
+    """Sequence classifier producing IntentGuardrailOutput for confident predictions."""
+
+    def __init__(self, model_dir: str, min_confidence: float = INTENT_CLASSIFIER_MIN_CONFIDENCE):
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+        from transformers import AutoTokenizer
+
+        self.min_confidence = min_confidence
+        self._tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self._model = ORTModelForSequenceClassification.from_pretrained(model_dir)
+        self._labels = [IntentCategory(self._model.config.id2label[i]) for i in range(len(self._model.config.id2label))]
+
+    def predict(self, message: str) -> Tuple[IntentCategory, float]:
+        """
+        Return the most likely intent and its softmax probability.
+
+        Args:
+            message: User message
+
+        Returns:
+            (intent, probability)
+        """
+        inputs = self._tokenizer(message, return_tensors="np", truncation=True, max_length=128)
+        logits = np.asarray(self._model(**inputs).logits[0], dtype=np.float32)
+        probabilities = np.exp(logits - logits.max())
+        probabilities /= probabilities.sum()
+        best = int(probabilities.argmax())
+        return self._labels[best], float(probabilities[best])
+
+    async def classify(self, message: str) -> Optional[IntentGuardrailOutput]:
+        """
+        Classify `message`, or return None if the prediction is not confident enough.
+
+        Args:
+            message: User message
+
+        Returns:
+            IntentGuardrailOutput, or None to fall back to the LLM classifier
+        """
+        # ONNX Runtime releases the GIL, so inference doesn't block the event loop
+        intent, probability = await asyncio.to_thread(self.predict, message)
+        if probability < self.min_confidence:
+            return None
+        return IntentGuardrailOutput(
+            query=message,
+            intent=intent,
+            reasoning=f"Classified by the local intent classifier as {intent.value} (p={probability:.2f}).",
+            confidence=probability,
+            allowed=intent != IntentCategory.OUT_OF_SCOPE,
+        )
+
+
+def load_intent_classifier() -> Optional[LocalIntentClassifier]:
+    """
+    Load the classifier from INTENT_CLASSIFIER_MODEL_DIR, if configured.
+
+    Returns:
+        LocalIntentClassifier, or None when not configured or not loadable
+    """
+    if not INTENT_CLASSIFIER_MODEL_DIR:
+        return None
+    try:
+        classifier = LocalIntentClassifier(INTENT_CLASSIFIER_MODEL_DIR)
+    except Exception as e:
+        logger.warning("Local intent classifier unavailable (%s); using the LLM classifier", e)
+        return None
+    logger.info("Loaded local intent classifier from %s", INTENT_CLASSIFIER_MODEL_DIR)
+    return classifier
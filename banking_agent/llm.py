@@ -0,0 +1,254 @@
+"""
+Gemini model wrappers
+
+EarlyVerdictGemini streams the validator's ValidationResult JSON and stops
+decoding as soon as the verdict is known to be a pass. is_valid is the first
+field of the schema, so a passing verdict is decided within the first few
+output tokens; the remaining booleans follow from it and `feedback` is empty,
+so generating them only adds latency and output tokens. The upstream stream is
+closed at that point and the rest of the result is filled in locally (see
+passing_validation_json for which fields are read from the stream and which
+are defaults).
+
+Failing verdicts are generated in full, since the concierge's retry needs the
+model's `feedback`.
+
+PooledGemini makes every agent's model share one google-genai client (and so
+one httpx connection pool) per event loop, instead of ADK's one client per
+model. The intent, concierge and validator calls of a turn then reuse a
+warm keep-alive connection rather than each paying for TCP + TLS setup.
+The shared client is built with the same options as ADK's Gemini.api_client
+(tracking headers, base_url / api_version, Vertex AI `projects/` models).
+HTTP/2 is used when the optional `h2` package is installed. Servers that
+manage their own lifecycle can await aclose_shared_client() on shutdown;
+otherwise the clients are closed at interpreter exit.
+"""
+
+import asyncio
+import atexit
+import importlib.util
+import inspect
+import logging
+import re
+from contextlib import aclosing
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
+
+import httpx
+from google.adk.models import Gemini, LlmRequest, LlmResponse
+from google.genai import Client, types
+
+from .models import ValidationResult
+
+logger = logging.getLogger(__name__)
+
+_IS_VALID_PATTERN = re.compile(r'"is_valid"\s*:\s*(true|false)')
+_VALIDATION_MODE_PATTERN = re.compile(r'"validation_mode"\s*:\s*"([a-z_]+)"')
+
+# Marks responses whose ValidationResult was completed locally
+EARLY_VERDICT_METADATA_KEY = "early_verdict"
+
+
+def passing_validation_json(streamed_prefix: str) -> str:
+    """
+    ValidationResult JSON reported when decoding is stopped on a passing verdict.
+
+    A valid response passes every check (the validator only sets is_valid when
+    traceability, consistency and tool usage all pass) and carries no feedback,
+    so those fields are defaults rather than model output. validation_mode is
+    taken from `streamed_prefix` if the model already emitted it, and is None
+    otherwise; callers that know the user intent fill it in afterwards.
+
+    Args:
+        streamed_prefix: Validator output received before decoding was stopped
+
+    Returns:
+        Serialized ValidationResult
+    """
+    mode = _VALIDATION_MODE_PATTERN.search(streamed_prefix)
+    return ValidationResult(
+        is_valid=True,
+        traceability_check=True,
+        consistency_check=True,
+        tool_usage_check=True,
+        validation_mode=mode.group(1) if mode else None,
+        feedback="",
+        escalate=True,
+    ).model_dump_json()
+
+
+# Keep-alive pool shared by all agents; a turn makes at most a handful of
+# concurrent model calls per session
+HTTP_POOL_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=60)
+HTTP2_ENABLED = importlib.util.find_spec("h2") is not None
+
+# (event loop, client options) -> shared client (httpx connections are bound to
+# the loop that opened them). All agents use the same options, so in practice
+# there is one client per loop.
+_clients: Dict[Tuple[Optional[asyncio.AbstractEventLoop], str], Client] = {}
+
+
+def _adk_client_options(model: Gemini) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Return the (HttpOptions kwargs, Client kwargs) ADK's Gemini.api_client would use for `model`.
+
+    Covers ADK's tracking headers, base_url / api_version and Vertex AI
+    (`projects/...`) models; attributes missing from older ADK releases are skipped.
+    """
+    headers = getattr(model, "_tracking_headers", None)
+    if callable(headers):
+        headers = headers()
+
+    base_url_and_version = getattr(model, "_base_url_and_api_version", None)
+    base_url, api_version = base_url_and_version or (getattr(model, "base_url", None), None)
+    if api_version is None and hasattr(model, "_configured_api_version"):
+        api_version = model._configured_api_version()
+
+    http_kwargs: Dict[str, Any] = {"headers": headers, "base_url": base_url}
+    if api_version:
+        http_kwargs["api_version"] = api_version
+
+    client_kwargs: Dict[str, Any] = {}
+    extra_kwargs = getattr(model, "client_kwargs", None)
+    if model.model.startswith("projects/"):
+        # google-genai renamed `vertexai` to `enterprise`
+        vertex_flag = "enterprise" if "enterprise" in inspect.signature(Client).parameters else "vertexai"
+        client_kwargs[vertex_flag] = True
+    else:
+        try:
+            from google.adk.models.google_llm import get_gcp_client_defaults
+        except ImportError:
+            pass
+        else:
+            client_kwargs.update(get_gcp_client_defaults(extra_kwargs))
+    if extra_kwargs:
+        client_kwargs.update(extra_kwargs)
+    return http_kwargs, client_kwargs
+
+
+def shared_client(
+    retry_options: Optional[types.HttpRetryOptions] = None,
+    model: Optional[Gemini] = None,
+) -> Client:
+    """
+    Return the google-genai client shared by all PooledGemini models on this event loop.
+
+    Models with the same retry policy and client options (headers, endpoint,
+    Vertex AI settings) share one client and so one connection pool.
+
+    Args:
+        retry_options: HTTP retry policy for the client
+        model: Model whose ADK client options (see _adk_client_options) to apply
+
+    Returns:
+        google-genai Client backed by a pooled httpx.AsyncClient
+    """
+    try:
+        loop: Optional[asyncio.AbstractEventLoop] = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    http_kwargs, client_kwargs = _adk_client_options(model) if model is not None else ({}, {})
+    key = (loop, repr((retry_options, sorted(http_kwargs.items()), sorted(client_kwargs.items()))))
+    client = _clients.get(key)
+    if client is None:
+        # The async pools of clients whose loop has closed can no longer be
+        # awaited shut; dropping them lets their sockets be collected
+        for stale in [stale for stale in _clients if stale[0] is not None and stale[0].is_closed()]:
+            _clients.pop(stale).close()
+        client = Client(
+            http_options=types.HttpOptions(
+                retry_options=retry_options,
+                async_client_args={"http2": HTTP2_ENABLED, "limits": HTTP_POOL_LIMITS},
+                **http_kwargs,
+            ),
+            **client_kwargs,
+        )
+        _clients[key] = client
+    return client
+
+
+async def aclose_shared_client() -> None:
+    """
+    Close the shared clients of the running event loop, e.g. on server shutdown.
+
+    The next shared_client() call on this loop creates a new client.
+    """
+    loop = asyncio.get_running_loop()
+    for key in [key for key in _clients if key[0] is loop]:
+        client = _clients.pop(key)
+        await client.aio.aclose()
+        client.close()
+
+
+@atexit.register
+def _close_shared_clients() -> None:
+    """Release the sync transports of all shared clients at interpreter exit."""
+    while _clients:
+        _, client = _clients.popitem()
+        try:
+            client.close()
+        except Exception as e:
+            logger.debug("Closing shared Gemini client failed: %s", e)
+
+
+class PooledGemini(Gemini):
+    """Gemini model that uses the shared, pooled google-genai client."""
+
+    @property
+    def api_client(self) -> Client:
+        # An explicitly supplied client wins, as in Gemini.api_client
+        if getattr(self, "client", None):
+            return self.client
+        return shared_client(self.retry_options, model=self)
+
+
+def _response_text(response: LlmResponse) -> str:
+    """Concatenate the non-thought text parts of a model response."""
+    if not response.content or not response.content.parts:
+        return ""
+    return "".join(part.text for part in response.content.parts if part.text and not part.thought)
+
+
+class EarlyVerdictGemini(PooledGemini):
+    """
+    Gemini model that stops generating a ValidationResult once it reads is_valid: true.
+
+    The request is always sent as a streaming call; callers receive a single,
+    complete (non-partial) response either way. A verdict completed locally is
+    marked with EARLY_VERDICT_METADATA_KEY in custom_metadata.
+    """
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        chunks: List[str] = []
+        final = None
+        async with aclosing(super().generate_content_async(llm_request, stream=True)) as responses:
+            async for response in responses:
+                if not response.partial:
+                    # Aggregated response at the end of the stream, or an error
+                    if response.error_code or _response_text(response):
+                        final = response
+                        break
+                    continue
+                chunks.append(_response_text(response))
+                prefix = "".join(chunks)
+                verdict = _IS_VALID_PATTERN.search(prefix)
+                if verdict and verdict.group(1) == "true":
+                    # Leaving the block closes the stream, which cancels generation
+                    logger.debug("Validator passed; stopped decoding after %d chunks", len(chunks))
+                    yield LlmResponse(
+                        content=types.Content(
+                            role="model", parts=[types.Part(text=passing_validation_json(prefix))]
+                        ),
+                        turn_complete=True,
+                        custom_metadata={EARLY_VERDICT_METADATA_KEY: True},
+                    )
+                    return
+
+        if final is None:
+            final = LlmResponse(
+                content=types.Content(role="model", parts=[types.Part(text="".join(chunks))]),
+                turn_complete=True,
+            )
+        yield final
@@ -1,3 +1,78 @@
+import os
+from functools import lru_cache
+
+# Example classifications: rendered into INTENT_AGENT_PROMPT's EXAMPLES section and
+# loaded into INTENT_EXACT_CACHE, so the prompt and the fast path cannot drift apart
+INTENT_EXAMPLES: list[tuple[str, dict]] = [
+    (
+        "Hello there",
+        {
+            "intent": "greet",
+            "reasoning": "The message is a simple greeting with no specific question or request.",
+            "confidence": 0.98,
+            "allowed": True,
+        },
+    ),
+    (
+        "Hi, what's your name?",
+        {
+            "intent": "general_question",
+            "reasoning": "The message includes a greeting ('hi') followed by a question about the agent's name. While both intents are present, according to the priority rules, we classify as 'general_question' since it asks about the agent's identity.",
+            "confidence": 0.95,
+            "allowed": True,
+        },
+    ),
+    (
+        "What is the latest GIS view for EMEA?",
+        {
+            "intent": "investment_related_question",
+            "reasoning": "The question is asking about global investment strategy (GIS) for EMEA region, which is directly related to investment topics.",
+            "confidence": 0.95,
+            "allowed": True,
+        },
+    ),
+    (
+        "What's your name?",
+        {
+            "intent": "general_question",
+            "reasoning": "The user is asking about the agent's identity, which is a common general question about the agent itself.",
+            "confidence": 0.90,
+            "allowed": True,
+        },
+    ),
+    (
+        "Tell me how to hack into someone's bank account",
+        {
+            "intent": "out_of_scope",
+            "reasoning": "This request is related to illegal activities and cannot be supported by a bank representative.",
+            "confidence": 0.99,
+            "allowed": False,
+        },
+    ),
+    (
+        "How do I cook pasta?",
+        {
+            "intent": "out_of_scope",
+            "reasoning": "This question is about cooking, which is unrelated to banking, investments, or financial services.",
+            "confidence": 0.97,
+            "allowed": False,
+        },
+    ),
+]
+
+
+def _format_intent_example(message: str, result: dict) -> str:
+    return (
+        f'User: "{message}"\n'
+        "{\n"
+        f'"intent": "{result["intent"]}",\n'
+        f'"reasoning": "{result["reasoning"]}",\n'
+        f'"confidence": {result["confidence"]:.2f},\n'
+        f'"allowed": {str(result["allowed"]).lower()}\n'
+        "}\n"
+    )
+
+
 ### AGENT INSTRUCTIONS
 INTENT_AGENT_PROMPT = """
 You are an Intent Classification Agent that analyzes user messages and classifies them into specific intents.
@@ -47,54 +122,34 @@ Where:
 - "allowed" is whether this intent should be allowed to proceed (set to false ONLY for "out_of_scope")
 
 ## EXAMPLES
-User: "Hello there"
-{
-"intent": "greet",
-"reasoning": "The message is a simple greeting with no specific question or request.",
-"confidence": 0.98,
-"allowed": true
-}
+"""
+INTENT_AGENT_PROMPT += "\n".join(_format_intent_example(message, result) for message, result in INTENT_EXAMPLES)
 
-User: "Hi, what's your name?"
-{
-"intent": "general_question",
-"reasoning": "The message includes a greeting ('hi') followed by a question about the agent's name. While both intents are present, according to the priority rules, we classify as 'general_question' since it asks about the agent's identity.",
-"confidence": 0.95,
-"allowed": true
-}
+# Classifications for the messages used as examples in INTENT_AGENT_PROMPT, keyed by
+# normalize_intent_message(). These are checked before any cache or LLM call; the
+# original message is filled in as "query" by the caller.
+INTENT_EXACT_CACHE: dict[str, dict] = {}
 
-User: "What is the latest GIS view for EMEA?"
-{
-"intent": "investment_related_question",
-"reasoning": "The question is asking about global investment strategy (GIS) for EMEA region, which is directly related to investment topics.",
-"confidence": 0.95,
-"allowed": true
-}
 
-User: "What's your name?"
-{
-"intent": "general_question",
-"reasoning": "The user is asking about the agent's identity, which is a common general question about the agent itself.",
-"confidence": 0.90,
-"allowed": true
-}
+def normalize_intent_message(message: str) -> str:
+    """
+    Normalize a user message for INTENT_EXACT_CACHE lookup (case, surrounding whitespace, final punctuation).
+    """
+    return message.strip().lower().rstrip("?!.").strip()
 
-User: "Tell me how to hack into someone's bank account"
-{
-"intent": "out_of_scope",
-"reasoning": "This request is related to illegal activities and cannot be supported by a bank representative.",
-"confidence": 0.99,
-"allowed": false
-}
 
-User: "How do I cook pasta?"
-{
-"intent": "out_of_scope",
-"reasoning": "This question is about cooking, which is unrelated to banking, investments, or financial services.",
-"confidence": 0.97,
-"allowed": false
-}
-"""
+def register_intent(example: str, result: dict) -> None:
+    """
+    Add a known classification to INTENT_EXACT_CACHE (e.g. to promote a frequent, high-confidence message).
+    """
+    INTENT_EXACT_CACHE[normalize_intent_message(example)] = {
+        key: result[key] for key in ("intent", "reasoning", "confidence", "allowed")
+    }
+
+
+for _message, _result in INTENT_EXAMPLES:
+    register_intent(_message, _result)
+
 
 CONCIERGE_INSTRUCTIONS = """
 ## SYSTEM ROLE & IDENTITY
@@ -117,26 +172,6 @@ You are Avery, a professional and helpful concierge agent for JP Morgan's Client
 - CREATIVE AND HELPFUL RESPONSES: Respond to user questions in a creative and helpful way using the documents provided
 - INTELLIGENT FOLLOW-UP POLICY: ONLY when appropriate to the natural conversation flow, offer 1-3 relevant follow-up questions in the follow_up_questions key only. Do NOT include follow-up questions in voice or text responses.
 
-## VALIDATION & RETRY FEEDBACK
-
-{% if temp:retry_count > 0 %}
-⚠️ VALIDATION FEEDBACK (Attempt {{temp:retry_count + 1}}/3):
-
-Your previous response had the following issues:
-{{temp:validation_feedback}}
-
-Please regenerate your response addressing these specific issues while maintaining all other quality standards.
-
-**Critical Points to Address:**
-- Ensure ALL claims in both voice_str and text fields are present in the RAG tool output
-- Maintain semantic consistency between voice and text (text should elaborate on voice, not discuss different topics)
-- Do NOT fabricate or infer information beyond what's explicitly stated in the source documents
-- Do NOT include follow-up questions about topics not covered in the RAG results
-- Review the validation feedback carefully and make targeted corrections
-
-This is retry attempt {{temp:retry_count + 1}} of 3. If validation fails again, the query will be escalated to a specialist.
-{% endif %}
-
 ## IMPORTANT - Structured Response Format with Markdown
 - Your responses must be structured with these fields:
   - voice: Natural, conversational text to be spoken aloud. Keep it concise and easy to understand when heard and under 30 words.
@@ -174,33 +209,7 @@ text: "## Key Market Implications from Fed Rate Cut
 send_to_ui: true # Set to true because there's formatted markdown content with document information
 follow_up_questions: [] # No follow-up for initial question on greeting
 
-Note: For greetings and welcome messages, always set send_to_ui to false since they don't contain document-specific markdown content.
-### Document Navigation
-Voice response: "Our Investment strategy report shows three key points about Fed cuts: soft landing expected, tech and financials favored, and yields should be locked in while rates are high."
-
-Text response (markdown):
-```markdown
-## Fed Rate Cutting Playbook Highlights
-
-### 1. Economic Context
-- **Soft landing expected** with cuts beginning in a non-recessionary environment
-- Unlike typical recession-driven cycles, current cuts are preemptive
-- Historical data shows stronger equity performance during non-recessionary cuts
-
-### 2. Sector Performance Outlook
-- Technology: **+35% average performance** during similar rate cut cycles
-- Financials: **+22% average performance** with steppening yield curve
-- Communication Services: **+27% average performance** as digital engagement rises
-
-### 3. Fixed Income Strategy Recommendations
-- Recommend locking in yields now before further rate declines
-- Focus on investment grade credit with maturities under 10 years
-- Consider long-duration municipal bonds for tax advantages in higher brackets
-
-
-follow_up_questions: [] # Generate follow-ups naturally based on content
-
-Note: Use natural speech patterns for voice, keep under 30 words, while providing rich markdown formatting for text display. Put follow-up questions only in the follow_up_questions key
+See SAMPLE INTERACTION PATTERNS below for greeting, document navigation and multi-document examples.
 
 
 ## CONVERSATION GUIDELINES
@@ -486,32 +495,49 @@ send_to_ui: true # Set to true because there's formatted markdown content with d
 Note: Create natural, conversational follow-up questions without being constrained by specific templates or examples. Let follow-ups emerge naturally from the conversation context.
 """
 
-VALIDATOR_INSTRUCTIONS = """
-You are a response quality validator for Avery, a banking AI assistant.
-
-Your job is to ensure responses meet strict compliance and quality requirements before being shown to users.
-
-## VALIDATION ATTEMPT: {{temp:retry_count + 1}}/3
-
-## USER INTENT: {{user_intent.intent}}
-
-The validation rules you apply depend on the user's intent. Different intent types have different requirements for RAG tool usage and grounding.
+# Human-authored source of the concierge instructions; compress_prompts.py compresses this
+CONCIERGE_INSTRUCTIONS_SOURCE = CONCIERGE_INSTRUCTIONS
+
+# Opt-in LLMLingua-2 compressed variant, generated offline into prompt_compressed.py.
+# Only enable after the compressed prompt passes the eval set (see compress_prompts.py).
+# The flag is an explicit opt-in, so a missing prompt_compressed.py fails import
+# rather than silently serving the uncompressed prompt.
+if os.environ.get("USE_COMPRESSED_PROMPTS", "false").lower() == "true":
+    try:
+        from .prompt_compressed import CONCIERGE_INSTRUCTIONS_COMPRESSED as CONCIERGE_INSTRUCTIONS
+    except ImportError as e:
+        raise ImportError(
+            "USE_COMPRESSED_PROMPTS=true but banking_agent/prompt_compressed.py is missing; "
+            "generate it with compress_prompts.py or unset the flag"
+        ) from e
+
+# Sent to the concierge as a trailing user message on validation retries (not part of
+# its system instruction), so the instruction and the conversation prefix stay
+# byte-identical across attempts and remain cacheable
+CONCIERGE_RETRY_FEEDBACK = """
+⚠️ VALIDATION FEEDBACK (Attempt {{temp:retry_count + 1}}/3):
 
-## RESPONSE TO VALIDATE:
+Your previous response had the following issues:
+{{temp:validation_feedback}}
 
-**Voice (spoken output, max 30 words):**
-{{avery_response.voice_str}}
+Please regenerate your response addressing these specific issues while maintaining all other quality standards.
 
-**Text (UI display, markdown formatted):**
-{{avery_response.text}}
+**Critical Points to Address:**
+- Ensure ALL claims in both voice_str and text fields are present in the RAG tool output
+- Maintain semantic consistency between voice and text (text should elaborate on voice, not discuss different topics)
+- Do NOT fabricate or infer information beyond what's explicitly stated in the source documents
+- Do NOT include follow-up questions about topics not covered in the RAG results
+- Review the validation feedback carefully and make targeted corrections
 
-**Send to UI:** {{avery_response.send_to_ui}}
+This is retry attempt {{temp:retry_count + 1}} of 3. If validation fails again, the query will be escalated to a specialist.
+"""
 
-**Follow-up Questions:** {{avery_response.follow_up_questions}}
+VALIDATOR_INSTRUCTIONS = """
+You are a response quality validator for Avery, a banking AI assistant.
 
-## RAG TOOL OUTPUT (Source of Truth):
+Your job is to ensure responses meet strict compliance and quality requirements before being shown to users.
 
-{{temp:last_rag_output}}
+The user intent, the response to validate, and the RAG tool output are provided in the RUNTIME STATE section at the end of these instructions.
 
 {% if user_intent.intent == "greet" %}
 ## VALIDATION MODE: GREETING
@@ -761,6 +787,30 @@ If validation fails, provide SPECIFIC, ACTIONABLE feedback:
 - For greetings and general questions, be more lenient about RAG grounding requirements
 """
 
+VALIDATOR_RUNTIME_STATE = """
+## VALIDATION ATTEMPT: {{temp:retry_count + 1}}/3
+
+## USER INTENT: {{user_intent.intent}}
+
+The validation rules you apply depend on the user's intent. Different intent types have different requirements for RAG tool usage and grounding.
+
+## RESPONSE TO VALIDATE:
+
+**Voice (spoken output, max 30 words):**
+{{avery_response.voice_str}}
+
+**Text (UI display, markdown formatted):**
+{{avery_response.text}}
+
+**Send to UI:** {{avery_response.send_to_ui}}
+
+**Follow-up Questions:** {{avery_response.follow_up_questions}}
+
+## RAG TOOL OUTPUT (Source of Truth):
+
+{{temp:last_rag_output}}
+"""
+
 RECOMMENDED_PROMPT_PREFIX = (
     "# System context\n"
     "You are part of a multi-agent system called the Agents SDK, designed to make agent "
@@ -778,8 +828,51 @@ RECOMMENDED_PROMPT_PREFIX = (
     "- The entire multi-agent system should appear to users as one seamless entity"
 )
 
+# Separates the static instruction prefix from per-turn template variables.
+# Gemini's implicit prompt cache matches on the longest byte-identical prefix,
+# so everything before this marker must stay constant across requests.
+RUNTIME_STATE_DELIMITER = "\n---\nRUNTIME STATE:\n"
+
+
+@lru_cache(maxsize=8)
 def prompt_with_handoff_instructions(prompt: str) -> str:
     """
     Add recommended instructions to the prompt for agents that use handoffs.
     """
     return f"{RECOMMENDED_PROMPT_PREFIX}\n\n{prompt}"
+
+
+# Token budgets for the static prompts (cl100k_base tokens, ~15% above their
+# current size). Gemini tokenizes differently, but a budget on a fixed encoding
+# still catches prompts drifting upward, which raises TTFT and cost per turn.
+PROMPT_TOKEN_BUDGETS = {
+    "INTENT_AGENT_PROMPT": 1200,
+    "CONCIERGE_INSTRUCTIONS": 5600,
+    "VALIDATOR_INSTRUCTIONS": 3300,
+}
+
+
+def check_prompt_budgets() -> None:
+    """
+    Fail fast if a static prompt exceeds its entry in PROMPT_TOKEN_BUDGETS.
+
+    Requires the optional `tiktoken` package. Runs once at import when
+    BANKING_STRICT_PROMPT_BUDGET=1 (e.g. in CI), never per request.
+
+    Raises:
+        ValueError: If any prompt is over budget
+    """
+    import tiktoken
+
+    encoding = tiktoken.get_encoding("cl100k_base")
+    over_budget = []
+    for name, budget in PROMPT_TOKEN_BUDGETS.items():
+        tokens = len(encoding.encode(globals()[name]))
+        if tokens > budget:
+            over_budget.append(f"{name} is {tokens} tokens (budget {budget})")
+    if over_budget:
+        raise ValueError("Prompt token budget exceeded: " + "; ".join(over_budget))
+
+
+if os.environ.get("BANKING_STRICT_PROMPT_BUDGET") == "1":
+    check_prompt_budgets()
@@ -8,6 +8,7 @@ This script demonstrates how to:
 """
 
 import asyncio
+import logging
 import os
 from pathlib import Path
 from dotenv import load_dotenv
@@ -59,7 +60,7 @@ async def main():
         if results:
             for idx, result in enumerate(results, 1):
                 print(f"\nResult {idx}:")
-                content = result.get("content", str(result))
+                content = result["content"] if "content" in result else str(result)
                 # Truncate for display
                 print(content[:300] + "..." if len(content) > 300 else content)
         else:
@@ -106,6 +107,9 @@ async def example_reset():
 
 
 if __name__ == "__main__":
+    # Show ingestion progress logged by ingest.py
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
     # Run the main example
     asyncio.run(main())
 
@@ -5,35 +5,72 @@ This module provides functionality to ingest documents (particularly PDFs)
 into a knowledge base using the cognee library.
 """
 
+import asyncio
+import logging
 import os
+import time
 from pathlib import Path
-from typing import List, Union
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Union
 import cognee
 
+try:
+    from .retrieval import notify_index_refresh, record_latency
+except ImportError:  # Run as a script from the rag/ directory (see example.py)
+    from retrieval import notify_index_refresh, record_latency
 
-async def initialize_cognee():
-    """Initialize cognee with default configuration."""
-    # Configure cognee with API key from environment
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise ValueError("OPENAI_API_KEY not found in environment variables")
+logger = logging.getLogger(__name__)
 
-    # Set the API key in cognee's config
-    os.environ["LLM_API_KEY"] = api_key
-    cognee.config.llm_api_key = api_key
-    cognee.config.set_llm_api_key(api_key)
-    print("API key configured")
 
-    # Set LLM provider and model
-    cognee.config.set_llm_provider("openai")
-    cognee.config.set_llm_model("gpt-4o-mini")
-    print("LLM provider and model configured")
+async def _prune_all() -> None:
+    """Delete ingested data files and system stores (graph, vector, metadata) concurrently."""
+    # The two prunes remove separate storage roots, so neither waits on the other
+    await asyncio.gather(
+        cognee.prune.prune_data(),
+        cognee.prune.prune_system(metadata=True),
+    )
 
-    # Configure cognee - you can customize these settings
-    await cognee.prune.prune_data()  # Clean previous data
-    await cognee.prune.prune_system(metadata=True)
 
-    print("Cognee initialized successfully")
+# Set once initialize_cognee() has configured cognee in this process
+_cognee_initialized = False
+
+
+async def initialize_cognee(prune: bool = False, force: bool = False):
+    """
+    Initialize cognee with default configuration.
+
+    Configuration is applied once per process; later calls return immediately
+    unless `force` is set. Existing data is kept unless `prune` is set.
+
+    Args:
+        prune: Delete all ingested data and system metadata (full re-ingest needed)
+        force: Re-apply the configuration even if already initialized
+    """
+    global _cognee_initialized
+
+    if not _cognee_initialized or force:
+        # Configure cognee with API key from environment
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise ValueError("OPENAI_API_KEY not found in environment variables")
+
+        # Set the API key in cognee's config
+        os.environ["LLM_API_KEY"] = api_key
+        cognee.config.set_llm_api_key(api_key)
+        logger.info("API key configured")
+
+        # Set LLM provider and model
+        cognee.config.set_llm_provider("openai")
+        cognee.config.set_llm_model("gpt-4o-mini")
+        logger.info("LLM provider and model configured")
+
+        _cognee_initialized = True
+
+    if prune:
+        await _prune_all()  # Clean previous data
+        await notify_index_refresh()
+        logger.info("Existing knowledge base data pruned")
+
+    logger.info("Cognee initialized successfully")
 
 
 async def ingest_pdf(pdf_path: Union[str, Path]) -> dict:
@@ -54,7 +91,7 @@ async def ingest_pdf(pdf_path: Union[str, Path]) -> dict:
     if pdf_path.suffix.lower() != '.pdf':
         raise ValueError(f"File must be a PDF: {pdf_path}")
 
-    print(f"Ingesting PDF: {pdf_path.name}")
+    logger.debug("Ingesting PDF: %s", pdf_path.name)
 
     try:
         # Add the document to cognee
@@ -62,8 +99,9 @@ async def ingest_pdf(pdf_path: Union[str, Path]) -> dict:
 
         # Process the documents (this creates embeddings and knowledge graph)
         await cognee.cognify()
+        await notify_index_refresh()
 
-        print(f"Successfully ingested: {pdf_path.name}")
+        logger.debug("Successfully ingested: %s", pdf_path.name)
 
         return {
             "status": "success",
@@ -71,7 +109,7 @@ async def ingest_pdf(pdf_path: Union[str, Path]) -> dict:
             "filename": pdf_path.name
         }
     except Exception as e:
-        print(f"Error ingesting {pdf_path.name}: {str(e)}")
+        logger.error("Error ingesting %s: %s", pdf_path.name, e)
         return {
             "status": "error",
             "file": str(pdf_path),
@@ -79,73 +117,120 @@ async def ingest_pdf(pdf_path: Union[str, Path]) -> dict:
         }
 
 
+def _discover_files(document_paths: List[Union[str, Path]], extensions: Set[str]) -> Iterator[Path]:
+    """
+    Yield files under `document_paths` whose extension is in `extensions` (one walk per directory).
+
+    Each file is yielded once, even if it is reachable through several of the
+    given paths (e.g. a directory and one of its subdirectories).
+    """
+    seen: Set[Path] = set()
+
+    def first_visit(file_path: Path) -> bool:
+        resolved = file_path.resolve()
+        if resolved in seen:
+            return False
+        seen.add(resolved)
+        return True
+
+    for path in document_paths:
+        path = Path(path)
+
+        if path.is_file():
+            if path.suffix.lower() in extensions and first_visit(path):
+                yield path
+        elif path.is_dir():
+            for root, _, filenames in os.walk(path):
+                for filename in filenames:
+                    if os.path.splitext(filename)[1].lower() in extensions:
+                        file_path = Path(root) / filename
+                        if first_visit(file_path):
+                            yield file_path
+
+
 async def ingest_documents(
     document_paths: List[Union[str, Path]],
-    file_types: List[str] = None
+    file_types: List[str] = None,
+    max_concurrency: int = 8
 ) -> List[dict]:
     """
     Ingest multiple documents into the cognee knowledge base.
 
+    File discovery and cognee.add() are pipelined through a bounded queue:
+    `max_concurrency` workers start adding files as soon as the first ones
+    are found, instead of after the whole directory tree has been walked.
+    All added files are then processed together by a single cognify() call.
+
     Args:
         document_paths: List of paths to documents (files or directories)
         file_types: List of file extensions to process (e.g., ['.pdf', '.txt'])
                    If None, processes all supported types
+        max_concurrency: Number of workers calling cognee.add()
 
     Returns:
-        List[dict]: Status information for each ingested document
+        List[dict]: Status information for each ingested document, in discovery order
     """
     if file_types is None:
         file_types = ['.pdf', '.txt', '.md', '.docx']
 
-    results = []
-    files_to_process = []
+    extensions = {ext.lower() for ext in file_types}
+    queue: "asyncio.Queue[Optional[Tuple[int, Path]]]" = asyncio.Queue(maxsize=64)
+    results_by_index: Dict[int, dict] = {}
 
-    # Collect all files to process
-    for path in document_paths:
-        path = Path(path)
-
-        if path.is_file():
-            if path.suffix.lower() in file_types:
-                files_to_process.append(path)
-        elif path.is_dir():
-            for ext in file_types:
-                files_to_process.extend(path.glob(f"**/*{ext}"))
-
-    print(f"Found {len(files_to_process)} files to ingest")
-
-    # Process each file
-    for file_path in files_to_process:
+    async def produce() -> int:
+        count = 0
         try:
-            # Add the document to cognee
-            await cognee.add(str(file_path))
-            print(f"Added: {file_path.name}")
-
-            results.append({
-                "status": "queued",
-                "file": str(file_path),
-                "filename": file_path.name
-            })
-        except Exception as e:
-            print(f"Error adding {file_path.name}: {str(e)}")
-            results.append({
-                "status": "error",
-                "file": str(file_path),
-                "error": str(e)
-            })
+            for count, file_path in enumerate(_discover_files(document_paths, extensions), 1):
+                await queue.put((count - 1, file_path))
+                await asyncio.sleep(0)  # Let workers start on queued files while the walk continues
+            logger.info("Found %d files to ingest", count)
+        finally:
+            # Always stop the workers, even if discovery fails part-way
+            for _ in range(max_concurrency):
+                await queue.put(None)
+        return count
+
+    async def add_files() -> None:
+        while (item := await queue.get()) is not None:
+            index, file_path = item
+            try:
+                # Add the document to cognee
+                started = time.perf_counter_ns()
+                await cognee.add(str(file_path))
+                record_latency("add", time.perf_counter_ns() - started)
+                logger.debug("Added: %s", file_path.name)
+
+                results_by_index[index] = {
+                    "status": "queued",
+                    "file": str(file_path),
+                    "filename": file_path.name
+                }
+            except Exception as e:
+                logger.error("Error adding %s: %s", file_path.name, e)
+                results_by_index[index] = {
+                    "status": "error",
+                    "file": str(file_path),
+                    "error": str(e)
+                }
+
+    file_count, *_ = await asyncio.gather(produce(), *(add_files() for _ in range(max_concurrency)))
+
+    results = [results_by_index[index] for index in range(file_count)]
 
     # Process all documents at once
-    if files_to_process:
+    if results:
         try:
-            print("Processing documents and building knowledge graph...")
+            logger.info("Processing documents and building knowledge graph...")
             await cognee.cognify()
-            print("All documents processed successfully")
+            await notify_index_refresh()
+            logger.info("All documents processed successfully")
 
             # Update status for all queued items
             for result in results:
                 if result["status"] == "queued":
                     result["status"] = "success"
         except Exception as e:
-            print(f"Error during cognify: {str(e)}")
+            logger.exception("Error during cognify: %s", e)
             for result in results:
                 if result["status"] == "queued":
                     result["status"] = "error"
@@ -159,7 +244,7 @@ async def reset_knowledge_base():
     Reset the entire knowledge base.
     Use with caution - this will delete all ingested data!
     """
-    print("Resetting knowledge base...")
-    await cognee.prune.prune_data()
-    await cognee.prune.prune_system(metadata=True)
-    print("Knowledge base reset complete")
+    logger.info("Resetting knowledge base...")
+    await _prune_all()
+    await notify_index_refresh()
+    logger.info("Knowledge base reset complete")
@@ -3,11 +3,143 @@ RAG Retrieval Module using Cognee
 
 This module provides functionality to query the knowledge base
 and retrieve relevant information.
+
+search_knowledge() keeps recent results in an in-process TTL/LRU cache keyed
+by (normalized query, limit, search type), and concurrent identical searches
+share one cognee call. The cache is cleared whenever the index changes
+(notify_index_refresh).
+
+Latencies of recent cognee calls are kept per operation (search type, add) and
+summarized by get_profile(), to show which query patterns dominate before
+optimizing further.
 """
 
-from typing import List, Dict, Any, Optional
+import asyncio
+import inspect
+import logging
+import math
+import time
+from collections import OrderedDict, deque
+from functools import lru_cache, partial
+from typing import Awaitable, Callable, Deque, List, Dict, Any, Optional, Tuple, Union
 import cognee
 
+try:
+    from cognee.api.v1.search import SearchType
+except ImportError:  # Moved in this cognee version; search_knowledge() logs the error
+    SearchType = None
+
+logger = logging.getLogger(__name__)
+
+# search_type argument -> cognee SearchType, built once at import
+_SEARCH_TYPE_MAP: Dict[str, Any] = {
+    "summaries": SearchType.SUMMARIES,
+    "chunks": SearchType.CHUNKS,
+    "natural_language": SearchType.NATURAL_LANGUAGE,
+} if SearchType is not None else {}
+
+# cognee.search() takes top_k in newer releases; older ones return every match
+_SEARCH_SUPPORTS_TOP_K = "top_k" in inspect.signature(cognee.search).parameters
+
+# Callbacks run whenever the knowledge base index changes (ingest / reset)
+_index_refresh_listeners: List[Callable[[], Union[None, Awaitable[None]]]] = []
+
+SEARCH_CACHE_MAX_ENTRIES = 512
+SEARCH_CACHE_TTL_SECONDS = 300
+
+SearchKey = Tuple[str, int, str]
+
+# (normalized query, limit, search type) -> (expires_at, results), least recently used first
+_search_cache: "OrderedDict[SearchKey, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+
+# Searches in progress, shared by concurrent callers with the same key
+_search_inflight: Dict[SearchKey, asyncio.Task] = {}
+
+# Incremented on every index refresh so searches started before it are not cached
+_index_generation = 0
+
+
+def on_index_refresh(callback: Callable[[], Union[None, Awaitable[None]]]) -> None:
+    """
+    Register a callback to run after the knowledge base index changes.
+
+    Use this to invalidate caches built on top of search results.
+
+    Args:
+        callback: Sync or async callable taking no arguments
+    """
+    _index_refresh_listeners.append(callback)
+
+
+async def notify_index_refresh() -> None:
+    """Clear cached search results and run all callbacks registered with on_index_refresh()."""
+    global _index_generation
+    _index_generation += 1
+    _search_cache.clear()
+    _search_inflight.clear()
+    for callback in _index_refresh_listeners:
+        result = callback()
+        if result is not None:
+            await result
+
+
+# operation (e.g. "search:summaries", "add") -> most recent backend call latencies in ns
+LATENCY_SAMPLES_PER_OPERATION = 1024
+_latencies: Dict[str, Deque[int]] = {}
+
+
+def record_latency(operation: str, elapsed_ns: int) -> None:
+    """
+    Record the latency of one cognee backend call for get_profile().
+
+    Args:
+        operation: Operation name, e.g. "search:summaries" or "add"
+        elapsed_ns: Call duration from time.perf_counter_ns()
+    """
+    samples = _latencies.get(operation)
+    if samples is None:
+        samples = _latencies[operation] = deque(maxlen=LATENCY_SAMPLES_PER_OPERATION)
+    samples.append(elapsed_ns)
+
+
+def get_profile() -> Dict[str, Dict[str, float]]:
+    """
+    Summarize recent cognee call latencies per operation.
+
+    Only backend calls are recorded; search cache hits are not.
+
+    Returns:
+        Dict of operation -> {"count", "p50_ms", "p95_ms", "max_ms"} over the
+        last LATENCY_SAMPLES_PER_OPERATION calls
+    """
+    profile = {}
+    for operation, samples in _latencies.items():
+        ordered = sorted(samples)
+        if not ordered:
+            continue
+        profile[operation] = {
+            "count": len(ordered),
+            "p50_ms": ordered[len(ordered) // 2] / 1e6,
+            "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] / 1e6,
+            "max_ms": ordered[-1] / 1e6,
+        }
+    return profile
+
+
+async def embed_queries(queries: List[str]) -> List[List[float]]:
+    """
+    Embed queries with the same embedding engine cognee uses for the index.
+
+    Args:
+        queries: The query strings to embed (sent as one batch)
+
+    Returns:
+        List[List[float]]: One embedding per query, in order
+    """
+    from cognee.infrastructure.databases.vector.embeddings import get_embedding_engine
+
+    return await get_embedding_engine().embed_text(queries)
+
 
 async def search_knowledge(
     query: str,
@@ -17,6 +149,9 @@ async def search_knowledge(
     """
     Search the knowledge base for information relevant to the query.
 
+    Repeated searches within SEARCH_CACHE_TTL_SECONDS are served from the
+    in-process cache; concurrent identical searches share one cognee call.
+
     Args:
         query: The search query string
         limit: Maximum number of results to return (default: 5)
@@ -27,40 +162,69 @@ async def search_knowledge(
     Returns:
         List[Dict]: List of relevant results with their content and metadata
     """
-    print(f"Searching knowledge base for: '{query}'")
+    key = (" ".join(query.lower().split()), limit, search_type)
+
+    cached = _search_cache.get(key)
+    if cached is not None:
+        if cached[0] > time.monotonic():
+            _search_cache.move_to_end(key)
+            logger.debug("Search cache hit for: %r", query)
+            return list(cached[1])
+        del _search_cache[key]
+
+    task = _search_inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_search_uncached(query, limit, search_type))
+        _search_inflight[key] = task
+        task.add_done_callback(partial(_finish_search, key, _index_generation))
+
+    # shield: one caller being cancelled must not cancel the search for the others
+    return list(await asyncio.shield(task))
+
+
+def _finish_search(key: SearchKey, generation: int, task: asyncio.Task) -> None:
+    """Cache a completed search, unless it failed or the index changed while it ran."""
+    if _search_inflight.get(key) is task:
+        del _search_inflight[key]
+    if task.cancelled() or task.exception() is not None or generation != _index_generation:
+        return
+    results = task.result()
+    if not results:  # Empty results may be a failed search
+        return
+    _search_cache[key] = (time.monotonic() + SEARCH_CACHE_TTL_SECONDS, results)
+    while len(_search_cache) > SEARCH_CACHE_MAX_ENTRIES:
+        _search_cache.popitem(last=False)
+
+
+async def _search_uncached(query: str, limit: int, search_type: str) -> List[Dict[str, Any]]:
+    logger.debug("Searching knowledge base for: %r", query)
 
     try:
-        # Import SearchType enum from cognee
-        from cognee.api.v1.search import SearchType
+        if SearchType is None:
+            raise ImportError("cognee.api.v1.search.SearchType is not available")
 
         # Map to SearchType enum
-        search_type_map = {
-            "summaries": SearchType.SUMMARIES,
-            "chunks": SearchType.CHUNKS,
-            "natural_language": SearchType.NATURAL_LANGUAGE,
-        }
-
-        search_type_enum = search_type_map.get(search_type, SearchType.SUMMARIES)
+        search_type_enum = _SEARCH_TYPE_MAP.get(search_type, SearchType.SUMMARIES)
 
-        #  Search using cognee - query first, then search type
+        #  Search using cognee - query first, then search type; ask the
+        #  vector store for only `limit` rows where cognee supports it
+        search_kwargs = {"top_k": limit} if _SEARCH_SUPPORTS_TOP_K else {}
+        started = time.perf_counter_ns()
         results = await cognee.search(
             query,
-            search_type_enum
+            search_type_enum,
+            **search_kwargs
         )
+        record_latency(f"search:{search_type}", time.perf_counter_ns() - started)
 
         # Process and format results
-        formatted_results = []
-
         if isinstance(results, list):
-            for idx, result in enumerate(results[:limit]):
-                if isinstance(result, dict):
-                    formatted_results.append(result)
-                else:
-                    # If result is not a dict, convert it to one
-                    formatted_results.append({
-                        "content": str(result),
-                        "rank": idx + 1
-                    })
+            # Still sliced: older cognee releases ignore the limit.
+            # Dict results are used as-is; anything else is converted to one
+            formatted_results = [
+                result if isinstance(result, dict) else {"content": str(result), "rank": rank}
+                for rank, result in enumerate(results[:limit], 1)
+            ]
         else:
             # If results is a single item, wrap it in a list
             formatted_results = [{
@@ -68,54 +232,69 @@ async def search_knowledge(
                 "rank": 1
             }]
 
-        print(f"Found {len(formatted_results)} results")
+        logger.debug("Found %d results", len(formatted_results))
         return formatted_results
 
     except Exception as e:
-        print(f"Error during search: {str(e)}")
+        logger.error("Error during search: %s", e)
         return []
 
 
+@lru_cache(maxsize=1)
+def _default_tokenizer() -> Any:
+    import tiktoken
+
+    return tiktoken.encoding_for_model("gpt-4o-mini")
+
+
 async def get_context_for_query(
     query: str,
-    max_tokens: int = 2000
+    max_tokens: int = 2000,
+    tokenizer: Optional[Any] = None
 ) -> str:
     """
     Get formatted context from the knowledge base for a given query.
     This is useful for augmenting prompts with relevant information.
 
+    Only as many results as can plausibly fit are requested (about 200
+    tokens each, at least 1 and at most 10), and results are added until the
+    next one would exceed `max_tokens`.
+
     Args:
         query: The query to search for
-        max_tokens: Maximum approximate tokens to return (rough estimate)
+        max_tokens: Maximum tokens of result content to return
+        tokenizer: Object with an encode(str) method used to count tokens
+                   (default: tiktoken encoding for gpt-4o-mini, cognee's LLM)
 
     Returns:
         str: Formatted context string that can be added to prompts
     """
-    results = await search_knowledge(query, limit=10)
+    results = await search_knowledge(query, limit=max(1, min(10, math.ceil(max_tokens / 200))))
 
     if not results:
         return "No relevant information found in the knowledge base."
 
+    if tokenizer is None:
+        tokenizer = _default_tokenizer()
+
     # Build context string
     context_parts = ["Relevant information from knowledge base:\n"]
 
-    current_length = 0
-    max_chars = max_tokens * 4  # Rough estimate: 1 token ≈ 4 characters
+    total_tokens = 0
 
     for idx, result in enumerate(results, 1):
-        content = result.get("content", str(result))
+        content = result["content"] if "content" in result else str(result)
+        content_tokens = len(tokenizer.encode(content))
 
         # Check if adding this would exceed the limit
-        if current_length + len(content) > max_chars:
+        if total_tokens + content_tokens > max_tokens:
             break
 
-        context_parts.append(f"\n[Source {idx}]")
-        context_parts.append(content)
-        context_parts.append("\n")
+        context_parts.append(f"\n\n[Source {idx}]\n{content}\n\n")
 
-        current_length += len(content)
+        total_tokens += content_tokens
 
-    return "\n".join(context_parts)
+    return "".join(context_parts)
 
 
 async def search_with_filters(
@@ -52,7 +52,7 @@ async def test_queries():
                 print(f"\n✓ Found {len(results)} results:\n")
                 for idx, result in enumerate(results, 1):
                     print(f"--- Result {idx} ---")
-                    content = result.get("content", str(result))
+                    content = result["content"] if "content" in result else str(result)
                     # Display first 400 chars
                     display_content = content[:400] + "..." if len(content) > 400 else content
                     print(display_content)
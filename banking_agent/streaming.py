@@ -0,0 +1,221 @@
+"""
+Streaming voice_str extraction
+
+This module lets a voice client start text-to-speech before the concierge has
+finished generating its full structured response. The concierge replies with
+AgentResponse JSON, and voice_str is its first field, so with SSE streaming
+enabled the spoken answer arrives in the first few chunks while the longer
+markdown `text` field is still being generated.
+
+VoiceStrExtractor is a small incremental parser that pulls the voice_str value
+out of partial JSON as it streams; stream_voice() runs the agent with
+streaming enabled and yields voice deltas followed by each completed response.
+"""
+
+import json
+import logging
+from typing import AsyncIterator, List, Literal, Optional
+
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.runners import Runner
+from google.genai import types
+from pydantic import BaseModel, ValidationError
+
+from .models import AgentResponse
+
+logger = logging.getLogger(__name__)
+
+_KEY = '"voice_str"'
+_SIMPLE_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class VoiceStrExtractor:
+    """
+    Incrementally extracts the voice_str string value from streamed JSON.
+
+    Feed raw text chunks in arrival order; each call returns the newly decoded
+    part of voice_str (possibly empty). Escape sequences split across chunks are
+    held back until complete.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._in_value = False
+        self._pending_high_surrogate: Optional[str] = None
+        self.done = False
+
+    def feed(self, chunk: str) -> str:
+        """
+        Consume a chunk of streamed JSON.
+
+        Args:
+            chunk: Next piece of the model's JSON output
+
+        Returns:
+            Newly available voice_str text
+        """
+        if self.done or not chunk:
+            return ""
+        self._buffer += chunk
+
+        if not self._in_value and not self._find_value_start():
+            return ""
+        return self._decode_available()
+
+    @property
+    def found(self) -> bool:
+        """Whether the start of the voice_str value has been seen."""
+        return self._in_value or self.done
+
+    def _find_value_start(self) -> bool:
+        key_at = self._buffer.find(_KEY, self._pos)
+        if key_at < 0:
+            # Keep enough of the tail to match a key split across chunks
+            self._pos = max(self._pos, len(self._buffer) - len(_KEY))
+            return False
+
+        i = key_at + len(_KEY)
+        while i < len(self._buffer) and self._buffer[i] in " \t\r\n:":
+            i += 1
+        if i >= len(self._buffer):
+            self._pos = key_at
+            return False
+        if self._buffer[i] != '"':
+            # voice_str is not a string - leave it to the buffered fallback
+            self.done = True
+            return False
+
+        self._pos = i + 1
+        self._in_value = True
+        return True
+
+    def _decode_available(self) -> str:
+        out: List[str] = []
+        buffer, i = self._buffer, self._pos
+
+        while i < len(buffer):
+            char = buffer[i]
+            if char == '"':
+                self.done = True
+                self._in_value = False
+                i += 1
+                break
+            if char != "\\":
+                out.append(char)
+                i += 1
+                continue
+
+            # Escape sequence - wait for the rest of it if it was split
+            if i + 1 >= len(buffer):
+                break
+            code = buffer[i + 1]
+            if code in _SIMPLE_ESCAPES:
+                out.append(_SIMPLE_ESCAPES[code])
+                i += 2
+                continue
+            if code != "u":
+                out.append(code)
+                i += 2
+                continue
+            if i + 6 > len(buffer):
+                break
+            out.append(self._decode_unicode(buffer[i + 2:i + 6]))
+            i += 6
+
+        self._pos = i
+        return "".join(out)
+
+    def _decode_unicode(self, hex_digits: str) -> str:
+        char = chr(int(hex_digits, 16))
+        if "\ud800" <= char <= "\udbff":
+            self._pending_high_surrogate = char
+            return ""
+        if self._pending_high_surrogate and "\udc00" <= char <= "\udfff":
+            pair = self._pending_high_surrogate + char
+            self._pending_high_surrogate = None
+            return pair.encode("utf-16", "surrogatepass").decode("utf-16")
+        return char
+
+
+class StreamUpdate(BaseModel):
+    """One update from stream_voice()."""
+
+    kind: Literal["voice_delta", "response"]
+    attempt: int
+    text: str = ""
+    response: Optional[AgentResponse] = None
+
+
+async def stream_voice(
+    runner: Runner,
+    user_id: str,
+    session_id: str,
+    message: str,
+    agent_name: str = "avery_agent",
+) -> AsyncIterator[StreamUpdate]:
+    """
+    Run the agent with SSE streaming and yield voice_str text as it is generated.
+
+    Each concierge attempt (the validation loop may retry) yields its voice_str
+    deltas followed by one "response" update with the completed AgentResponse.
+    Voice deltas are provisional: the response has not been validated yet, so a
+    later attempt supersedes earlier ones. If voice_str cannot be parsed from the
+    stream, it is only delivered in the "response" update (buffered mode).
+
+    Responses the concierge does not generate itself - greetings, out-of-scope
+    answers, cache hits and the escalation message - come from other agents as
+    a single final event and are yielded as a "response" update as well.
+
+    Args:
+        runner: ADK runner for root_agent
+        user_id: User ID for the session
+        session_id: Session ID
+        message: User message text
+        agent_name: Name of the concierge agent whose output is streamed
+
+    Yields:
+        StreamUpdate items in generation order
+    """
+    run_config = RunConfig(streaming_mode=StreamingMode.SSE)
+    new_message = types.Content(role="user", parts=[types.Part(text=message)])
+
+    attempt = 1
+    extractor = VoiceStrExtractor()
+    async for event in runner.run_async(
+        user_id=user_id,
+        session_id=session_id,
+        new_message=new_message,
+        run_config=run_config,
+    ):
+        if not event.content or not event.content.parts:
+            continue
+        text = "".join(part.text for part in event.content.parts if part.text and not part.thought)
+        if not text:
+            continue
+
+        if event.author != agent_name:
+            # Intent and validator output is not an AgentResponse and is skipped
+            if not event.partial:
+                try:
+                    response = AgentResponse.model_validate_json(text)
+                except (ValidationError, json.JSONDecodeError):
+                    continue
+                yield StreamUpdate(kind="response", attempt=attempt, response=response)
+            continue
+
+        if event.partial:
+            delta = extractor.feed(text)
+            if delta:
+                yield StreamUpdate(kind="voice_delta", attempt=attempt, text=delta)
+            continue
+
+        try:
+            response = AgentResponse.model_validate_json(text)
+        except (ValidationError, json.JSONDecodeError) as e:
+            logger.warning("Could not parse %s response as AgentResponse: %s", agent_name, e)
+            response = None
+        yield StreamUpdate(kind="response", attempt=attempt, response=response)
+
+        attempt += 1
+        extractor = VoiceStrExtractor()
@@ -0,0 +1,136 @@
+"""
+Precompiled Instruction Templates
+
+This module builds ADK InstructionProviders from static prompts and Jinja2
+runtime-state templates. Templates are parsed and compiled once at import, so
+each turn only renders them against session state.
+
+Runtime templates are written with ADK-style state names (`temp:retry_count`,
+`user_intent.intent`) and Jinja2 control flow (`{% if %}`, `{{ x + 1 }}`).
+ADK's built-in placeholder substitution only replaces bare `{name}` lookups
+and leaves expressions and control blocks as literal text, so templates that
+need them are rendered here instead. compile_template() renders such a
+template on its own, for state-dependent text sent outside the instruction
+(the concierge's retry feedback message).
+
+Static prompts that branch on a single state value (the validator's
+`{% if user_intent.intent == ... %}` sections) are pre-rendered once per value
+by compile_instruction_variants(), so each request picks a ready-made prefix
+and only the branch that applies is sent to the model. Each variant is itself
+byte-identical across requests, so it stays cacheable.
+
+Prompts with no runtime state at all are wrapped by static_instruction() so
+ADK does not rescan them for placeholders on every call. Prefixed names are
+not valid Jinja2 identifiers and are rewritten at compile time
+(`temp:retry_count` becomes `temp__retry_count`).
+"""
+
+import re
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional
+
+from google.adk.agents.readonly_context import ReadonlyContext
+from jinja2 import ChainableUndefined, Environment
+
+from .prompt import RUNTIME_STATE_DELIMITER
+
+InstructionProvider = Callable[[ReadonlyContext], str]
+
+_STATE_PREFIX_PATTERN = re.compile(r"\b(app|user|temp):(?=[A-Za-z_])")
+
+# Missing state renders as empty text (ADK raises KeyError instead); chained
+# lookups such as avery_response.text on a missing response stay empty too
+_environment = Environment(
+    autoescape=False,
+    keep_trailing_newline=True,
+    undefined=ChainableUndefined,
+)
+
+
+def _template_context(state: Mapping[str, Any]) -> Dict[str, Any]:
+    return {_STATE_PREFIX_PATTERN.sub(r"\1__", key): value for key, value in state.items()}
+
+
+def compile_template(template: str) -> Callable[[Mapping[str, Any]], str]:
+    """
+    Compile a Jinja2 template written with ADK-style state names.
+
+    Args:
+        template: Jinja2 template (e.g. using `temp:retry_count`)
+
+    Returns:
+        Function rendering the template against a session state mapping
+    """
+    compiled = _environment.from_string(_STATE_PREFIX_PATTERN.sub(r"\1__", template))
+
+    def render(state: Mapping[str, Any]) -> str:
+        return compiled.render(_template_context(state))
+
+    return render
+
+
+def static_instruction(prompt: str) -> InstructionProvider:
+    """
+    Build an InstructionProvider that returns `prompt` verbatim.
+
+    Args:
+        prompt: Prompt text with no state placeholders
+
+    Returns:
+        Callable usable as an LlmAgent `instruction`
+    """
+
+    def provide_instruction(context: ReadonlyContext) -> str:
+        return prompt
+
+    return provide_instruction
+
+
+def _nested_context(path: str, value: Any) -> Dict[str, Any]:
+    """Build {"a": {"b": value}} for path "a.b"."""
+    *parents, leaf = path.split(".")
+    context: Dict[str, Any] = {leaf: value}
+    for name in reversed(parents):
+        context = {name: context}
+    return context
+
+
+def _lookup(state: Mapping[str, Any], path: str) -> Optional[Any]:
+    value: Any = state
+    for name in path.split("."):
+        if not isinstance(value, Mapping):
+            return None
+        value = value.get(name)
+    return value
+
+
+def compile_instruction_variants(
+    static_template: str,
+    runtime_template: str,
+    state_path: str,
+    values: Iterable[str],
+) -> InstructionProvider:
+    """
+    Build an InstructionProvider whose static prefix is pre-rendered per value of one state entry.
+
+    Args:
+        static_template: Jinja2 template whose only variable is `state_path`
+        runtime_template: Jinja2 template rendered against session state each turn
+        state_path: Dotted state path the static template branches on (e.g. "user_intent.intent")
+        values: Values to pre-render; any other value uses the variant rendered with None
+
+    Returns:
+        Callable usable as an LlmAgent `instruction`
+    """
+    static = _environment.from_string(static_template)
+    prefixes = {
+        value: f"{static.render(_nested_context(state_path, value))}{RUNTIME_STATE_DELIMITER}"
+        for value in values
+    }
+    default_prefix = f"{static.render(_nested_context(state_path, None))}{RUNTIME_STATE_DELIMITER}"
+    render = compile_template(runtime_template)
+
+    def provide_instruction(context: ReadonlyContext) -> str:
+        prefix = prefixes.get(_lookup(context.state, state_path), default_prefix)
+        return prefix + render(context.state)
+
+    return provide_instruction
@@ -0,0 +1,75 @@
+"""Tests for banking_agent.batching.BatchCoalescer."""
+
+import asyncio
+import unittest
+
+from banking_agent.batching import BatchCoalescer
+
+
+class BatchCoalescerTest(unittest.IsolatedAsyncioTestCase):
+    async def test_coalesces_concurrent_items_in_order(self):
+        batches = []
+
+        async def double(items):
+            batches.append(list(items))
+            return [item * 2 for item in items]
+
+        coalescer = BatchCoalescer(double, window_seconds=0.01, min_qps=0)
+        results = await asyncio.gather(*(coalescer.submit(i) for i in range(3)))
+
+        self.assertEqual(results, [0, 2, 4])
+        self.assertEqual(batches, [[0, 1, 2]])
+
+    async def test_short_result_list_fails_every_caller(self):
+        async def drop_last(items):
+            return items[:-1]
+
+        coalescer = BatchCoalescer(drop_last, window_seconds=0.01, min_qps=0)
+        results = await asyncio.wait_for(
+            asyncio.gather(*(coalescer.submit(i) for i in range(3)), return_exceptions=True),
+            timeout=1,
+        )
+
+        self.assertEqual(len(results), 3)
+        for result in results:
+            self.assertIsInstance(result, ValueError)
+
+    async def test_short_result_list_fails_pass_through_call(self):
+        async def empty(items):
+            return []
+
+        coalescer = BatchCoalescer(empty, min_qps=float("inf"))
+        with self.assertRaises(ValueError):
+            await asyncio.wait_for(coalescer.submit(1), timeout=1)
+
+    async def test_batch_error_fails_every_caller(self):
+        async def fail(items):
+            raise RuntimeError("backend down")
+
+        coalescer = BatchCoalescer(fail, window_seconds=0.01, min_qps=0)
+        results = await asyncio.wait_for(
+            asyncio.gather(*(coalescer.submit(i) for i in range(2)), return_exceptions=True),
+            timeout=1,
+        )
+
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+
+    async def test_cancelled_batch_cancels_callers(self):
+        started = asyncio.Event()
+
+        async def hang(items):
+            started.set()
+            await asyncio.Event().wait()
+
+        coalescer = BatchCoalescer(hang, window_seconds=0.01, min_qps=0)
+        callers = [asyncio.ensure_future(coalescer.submit(i)) for i in range(2)]
+        await asyncio.wait_for(started.wait(), timeout=1)
+        for task in list(coalescer._running):
+            task.cancel()
+
+        results = await asyncio.wait_for(asyncio.gather(*callers, return_exceptions=True), timeout=1)
+        self.assertTrue(all(isinstance(result, asyncio.CancelledError) for result in results))
+
+
+if __name__ == "__main__":
+    unittest.main()
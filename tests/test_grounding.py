@@ -0,0 +1,43 @@
+"""Tests for banking_agent.cache.grounding.is_traceable."""
+
+import unittest
+
+from banking_agent.cache.grounding import is_traceable
+
+EVIDENCE = "Switzerland is ranked first in the Global Innovation Index for 2024."
+
+
+class IsTraceableTest(unittest.TestCase):
+    def test_grounded_sentence_passes(self):
+        self.assertTrue(is_traceable("Switzerland is ranked first in the Global Innovation Index.", EVIDENCE))
+
+    def test_negated_sentence_fails(self):
+        self.assertFalse(is_traceable("Switzerland is not ranked first in the Global Innovation Index.", EVIDENCE))
+        self.assertFalse(is_traceable("Switzerland isn't ranked first in the Global Innovation Index.", EVIDENCE))
+        self.assertFalse(is_traceable("Switzerland was never ranked first in the Global Innovation Index.", EVIDENCE))
+
+    def test_negation_present_in_evidence_passes(self):
+        evidence = "Switzerland is not ranked first in the Global Innovation Index for 2024."
+        self.assertTrue(is_traceable("Switzerland is not ranked first in the Global Innovation Index.", evidence))
+
+    def test_swapped_ranking_fails(self):
+        evidence = "Switzerland ranks 1st in the Global Innovation Index. Sweden ranks 2nd in the index."
+        self.assertTrue(is_traceable("Sweden ranks 2nd in the index.", evidence))
+        self.assertFalse(is_traceable("Sweden ranks 1st in the Global Innovation Index.", evidence))
+
+    def test_swapped_rankings_within_a_sentence_fail(self):
+        evidence = "Switzerland ranks 1st, the United Kingdom ranks 2nd and the United States ranks 3rd."
+        self.assertTrue(is_traceable("Switzerland ranks 1st, the United States ranks 3rd.", evidence))
+        self.assertFalse(is_traceable("The United States ranks 1st, Switzerland ranks 3rd.", evidence))
+
+    def test_swapped_figures_fail(self):
+        evidence = "Technology sector revenue grew +35% in 2024, while healthcare sector revenue grew +22%."
+        self.assertTrue(is_traceable("Technology sector revenue grew +35% in 2024.", evidence))
+        self.assertFalse(is_traceable("Technology sector revenue grew +22% and healthcare sector revenue grew +35%.", evidence))
+
+    def test_unsupported_figure_fails(self):
+        self.assertFalse(is_traceable("Switzerland is ranked first in the Global Innovation Index for 2023.", EVIDENCE))
+
+
+if __name__ == "__main__":
+    unittest.main()
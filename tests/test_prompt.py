@@ -0,0 +1,50 @@
+"""Tests that each section and example in banking_agent.prompt appears exactly once."""
+
+import re
+import unittest
+from collections import Counter
+
+from banking_agent.prompt import (
+    CONCIERGE_INSTRUCTIONS,
+    INTENT_AGENT_PROMPT,
+    INTENT_EXAMPLES,
+    VALIDATOR_INSTRUCTIONS,
+    _format_intent_example,
+)
+
+
+def _repeated(lines):
+    return [line for line, count in Counter(lines).items() if count > 1]
+
+
+def _headings(text):
+    return [line.strip() for line in text.splitlines() if line.startswith("#")]
+
+
+class PromptDuplicationTest(unittest.TestCase):
+    def test_concierge_sections_are_unique(self):
+        self.assertEqual(_repeated(_headings(CONCIERGE_INSTRUCTIONS)), [])
+
+    def test_concierge_examples_are_unique(self):
+        examples = re.findall(r'^voice: ".*"$', CONCIERGE_INSTRUCTIONS, re.MULTILINE)
+        self.assertTrue(examples)
+        self.assertEqual(_repeated(examples), [])
+
+    def test_intent_sections_are_unique(self):
+        self.assertEqual(_repeated(_headings(INTENT_AGENT_PROMPT)), [])
+
+    def test_each_intent_example_appears_once(self):
+        self.assertEqual(_repeated(message for message, _ in INTENT_EXAMPLES), [])
+        for message, result in INTENT_EXAMPLES:
+            with self.subTest(message=message):
+                self.assertEqual(INTENT_AGENT_PROMPT.count(_format_intent_example(message, result)), 1)
+
+    def test_validator_sections_are_unique_per_mode(self):
+        # Each validation mode has its own numbered checks, so headings repeat across modes
+        for mode in re.split(r"^(?=## )", VALIDATOR_INSTRUCTIONS, flags=re.MULTILINE):
+            with self.subTest(mode=mode.splitlines()[0] if mode.strip() else ""):
+                self.assertEqual(_repeated(_headings(mode)), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
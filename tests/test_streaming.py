@@ -0,0 +1,80 @@
+"""Tests for banking_agent.streaming.stream_voice."""
+
+import inspect
+import json
+import unittest
+
+from google.adk.events import Event
+from google.genai import types
+
+from banking_agent.agent import avery_agent
+from banking_agent.streaming import stream_voice
+
+
+def _event(author, text, partial=None):
+    return Event(
+        invocation_id="inv",
+        author=author,
+        partial=partial,
+        content=types.Content(role="model", parts=[types.Part(text=text)]),
+    )
+
+
+def _response(voice_str):
+    return json.dumps({"voice_str": voice_str, "text": "## Answer", "send_to_ui": True, "follow_up_questions": []})
+
+
+class _Runner:
+    """Stands in for Runner.run_async, replaying a recorded event sequence."""
+
+    def __init__(self, events):
+        self._events = events
+
+    async def run_async(self, **kwargs):
+        for event in self._events:
+            yield event
+
+
+async def _collect(events):
+    return [update async for update in stream_voice(_Runner(events), "u", "s", "What is the GIS view?")]
+
+
+class StreamVoiceTest(unittest.IsolatedAsyncioTestCase):
+    def test_default_agent_name_is_the_concierge(self):
+        default = inspect.signature(stream_voice).parameters["agent_name"].default
+        self.assertEqual(default, avery_agent.name)
+
+    async def test_streams_concierge_attempts(self):
+        first, second = _response("First try"), _response("Second try")
+        updates = await _collect([
+            _event("intent_agent", json.dumps({"query": "q", "intent": "general_question", "allowed": True})),
+            _event("avery_agent", first[:18], partial=True),
+            _event("avery_agent", first[18:], partial=True),
+            _event("avery_agent", first),
+            _event("validator_agent", json.dumps({"is_valid": False, "feedback": "bad"})),
+            _event("avery_agent", second, partial=True),
+            _event("avery_agent", second),
+            _event("validator_agent", json.dumps({"is_valid": True, "feedback": ""})),
+        ])
+
+        deltas = {}
+        for update in updates:
+            if update.kind == "voice_delta":
+                deltas[update.attempt] = deltas.get(update.attempt, "") + update.text
+        self.assertEqual(deltas, {1: "First try", 2: "Second try"})
+
+        responses = [(u.attempt, u.response.voice_str) for u in updates if u.kind == "response"]
+        self.assertEqual(responses, [(1, "First try"), (2, "Second try")])
+
+    async def test_yields_responses_from_other_agents(self):
+        updates = await _collect([
+            _event("intent_agent", json.dumps({"query": "hi", "intent": "greet", "allowed": True})),
+            _event("avery_with_validation", _response("Hello! I'm Avery.")),
+        ])
+
+        self.assertEqual([u.kind for u in updates], ["response"])
+        self.assertEqual(updates[0].response.voice_str, "Hello! I'm Avery.")
+
+
+if __name__ == "__main__":
+    unittest.main()